@@ -0,0 +1,477 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import extrator
+from extrator import (extrair_dados_lis, extrair_arquivos, expandir_tags, converter_numero, cabecalho_saida,
+                      DescobertaArquivos, GravadorSaida, PipelineExtracao)
+
+TAGS_PADRAO = ["BEGIN WRITE @WRITEMAXMIN #"]
+REFERENCIA_REGRESSAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "referencia_regressao.json")
+VALORES_MALFORMADOS = ["***", "1.2.3", "-", "1,5", "abc", "--.5", "9.9E+"]
+
+# --- GERAÇÃO DE ARQUIVOS SINTÉTICOS ---
+def gerar_lis(caminho, total_linhas, blocos=99, seed=0, faltantes=0.0, malformados=0.0, latin1=True):
+    # Listagem parecida com as reais: linhas de ruído (com acentos em latin-1),
+    # blocos BEGIN WRITE @WRITEMAXMIN n. em posições sorteadas e, opcionalmente,
+    # uma fração de valores ausentes ou malformados.
+    rnd = random.Random(seed)
+    tags = expandir_tags(TAGS_PADRAO)[:blocos]
+    posicoes = sorted(rnd.sample(range(total_linhas), min(len(tags), total_linhas)))
+    blocos_por_linha = dict(zip(posicoes, tags))
+    with open(caminho, 'w', encoding='latin-1') as f:
+        for i in range(total_linhas):
+            tag = blocos_por_linha.get(i)
+            if tag:
+                f.write(f" {tag}\n")
+                sorteio = rnd.random()
+                if sorteio < faltantes:
+                    f.write("\n")
+                elif sorteio < faltantes + malformados:
+                    f.write(f"   {rnd.choice(VALORES_MALFORMADOS)}\n")
+                else:
+                    f.write(f"   {rnd.uniform(-1e4, 1e4):.6f}  {rnd.uniform(-1e4, 1e4):.6f}\n")
+            elif latin1 and i % 50 == 0:
+                f.write(f" ESTAÇÃO Nº {i:6d}  TENSÃO µ={rnd.random():.4f} ±{rnd.random():.2e} °C\n")
+            else:
+                f.write(f" NODE {i:8d}  {rnd.random():.6e}  {rnd.random():.6e}  {rnd.random():.6e}\n")
+
+# --- IMPLEMENTAÇÃO ANTERIOR (REFERÊNCIA) ---
+def extrair_dados_lis_legado(caminho_arquivo, tags_template):
+    with open(caminho_arquivo, 'r', encoding='latin-1', errors='ignore') as f:
+        content = f.read()
+        if not any(tag.split('#')[0] in content for tag in tags_template):
+            return "Arquivo inválido (não contém tags esperadas)", None
+    with open(caminho_arquivo, 'r', encoding='latin-1', errors='ignore') as f:
+        linhas = [linha.strip() for linha in f.readlines()]
+    numeros_encontrados = []
+    for tag_inicio in expandir_tags(tags_template):
+        valor_numerico = None
+        try:
+            indice_tag = linhas.index(tag_inicio)
+            if indice_tag + 1 < len(linhas):
+                valor_numerico = converter_numero(linhas[indice_tag + 1])
+        except ValueError: pass
+        numeros_encontrados.append(valor_numerico)
+    return None, numeros_encontrados
+
+def cronometrar(funcao, arquivos, tags):
+    inicio = time.perf_counter()
+    resultados = [funcao(arquivo, tags) for arquivo in arquivos]
+    return time.perf_counter() - inicio, resultados
+
+def pico_memoria(funcao, arquivo, tags):
+    tracemalloc.start()
+    try:
+        funcao(arquivo, tags)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def gerar_lis_grande(caminho, megabytes, blocos=99, seed=0):
+    # Para arquivos de centenas de MB: repete um trecho de ruído de ~1 MB e
+    # intercala os blocos MAXMIN entre as repetições
+    rnd = random.Random(seed)
+    trecho = "".join(f" NODE {i:8d}  {rnd.random():.6e}  {rnd.random():.6e}  {rnd.random():.6e}\n" for i in range(16000))
+    repeticoes = max(1, int(megabytes * 2**20 / len(trecho)))
+    tags = expandir_tags(TAGS_PADRAO)[:blocos]
+    posicoes = dict(zip(sorted(rnd.sample(range(repeticoes), min(len(tags), repeticoes))), tags))
+    with open(caminho, 'w', encoding='latin-1') as f:
+        for r in range(repeticoes):
+            f.write(trecho)
+            if r in posicoes:
+                f.write(f" {posicoes[r]}\n   {rnd.uniform(-1e4, 1e4):.6f}  {rnd.uniform(-1e4, 1e4):.6f}\n")
+
+def gerar_corpus(pasta, args, subpastas=1):
+    arquivos = []
+    for i in range(args.arquivos):
+        destino = os.path.join(pasta, f"rodada_{i % subpastas:03d}") if subpastas > 1 else pasta
+        os.makedirs(destino, exist_ok=True)
+        caminho = os.path.join(destino, f"sintetico_{i:04d}.lis")
+        gerar_lis(caminho, args.linhas, blocos=args.blocos, seed=i,
+                  faltantes=getattr(args, 'faltantes', 0.0), malformados=getattr(args, 'malformados', 0.0))
+        arquivos.append(caminho)
+    return arquivos
+
+def pico_rss_mb(filhos=False):
+    # Pico de memória residente do processo até agora, ou do maior processo
+    # filho já encerrado (indisponível no Windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 1024
+
+def _executar_etapa(conexao, funcao, args):
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao(*args)
+    except Exception as e:
+        conexao.send((None, None, None, e))
+        return
+    conexao.send((time.perf_counter() - inicio, pico_rss_mb(), pico_rss_mb(filhos=True), resultado))
+
+def medir_etapa(funcao, *args):
+    # Roda funcao(*args) num processo novo (spawn), para o pico de memória ser
+    # só desta etapa; os processos de trabalho que ela criar entram à parte.
+    # Retorna (segundos, pico RSS, pico RSS dos filhos, resultado)
+    contexto = multiprocessing.get_context('spawn')
+    conexao, filho = contexto.Pipe(duplex=False)
+    processo = contexto.Process(target=_executar_etapa, args=(filho, funcao, args))
+    processo.start()
+    filho.close()
+    try:
+        tempo, rss, rss_filhos, resultado = conexao.recv()
+    except EOFError:
+        raise RuntimeError(f"a etapa terminou sem resultado (código {processo.exitcode})") from None
+    finally:
+        processo.join()
+    if tempo is None: raise resultado
+    return tempo, rss, rss_filhos, resultado
+
+def bench_extracao(args):
+    pasta = tempfile.mkdtemp(prefix="bench_lis_")
+    try:
+        arquivos = gerar_corpus(pasta, args)
+        tempo_legado, res_legado = cronometrar(extrair_dados_lis_legado, arquivos, TAGS_PADRAO)
+        tempo_novo, res_novo = cronometrar(extrair_dados_lis, arquivos, TAGS_PADRAO)
+        if res_legado != res_novo:
+            raise SystemExit("ERRO: resultados divergentes entre a implementação anterior e a atual")
+        print(f"{args.arquivos} arquivos x {args.linhas} linhas, {args.blocos} blocos")
+        print(f"  anterior (linhas.index): {tempo_legado:8.3f} s")
+        print(f"  atual (casador único):   {tempo_novo:8.3f} s")
+        print(f"  ganho: {tempo_legado / tempo_novo:.1f}x")
+        mb_arquivo = os.path.getsize(arquivos[0]) / 2**20
+        mb_legado = pico_memoria(extrair_dados_lis_legado, arquivos[0], TAGS_PADRAO) / 2**20
+        mb_novo = pico_memoria(extrair_dados_lis, arquivos[0], TAGS_PADRAO) / 2**20
+        print(f"  pico de memória por arquivo ({mb_arquivo:.1f} MB): anterior {mb_legado:.1f} MB, atual {mb_novo:.2f} MB")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def salvar_dados_legado(linhas, path):
+    # Caminho anterior: acumula todas as linhas e monta a planilha inteira no fim
+    data = list(linhas)
+    if path.endswith('.xlsx'):
+        import openpyxl
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(cabecalho_saida())
+        for row in data: sheet.append(row)
+        workbook.save(path)
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(cabecalho_saida())
+            writer.writerows(data)
+
+def salvar_dados_fluxo(linhas, path):
+    with GravadorSaida(path) as gravador:
+        for row in linhas: gravador.escrever(row)
+
+def linhas_sinteticas(total):
+    rnd = random.Random(0)
+    for i in range(total):
+        caminho = f"/dados/rodada_{i // 1000:04d}/sintetico_{i:06d}.lis"
+        yield [caminho, os.path.basename(caminho)] + [rnd.uniform(-1e4, 1e4) if rnd.random() > 0.1 else None for _ in range(99)]
+
+def bench_saida(args):
+    pasta = tempfile.mkdtemp(prefix="bench_saida_")
+    try:
+        for total in args.linhas:
+            for nome, funcao in [("anterior (lista + Workbook)", salvar_dados_legado), ("atual (fluxo)", salvar_dados_fluxo)]:
+                path = os.path.join(pasta, f"saida.{args.formato}")
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                try:
+                    funcao(linhas_sinteticas(total), path)
+                    pico = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                tempo = time.perf_counter() - inicio
+                print(f"{total:7d} linhas {args.formato}, {nome:28s}: pico {pico / 2**20:8.1f} MB, {tempo:7.2f} s")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def bench_tabela(args):
+    # Memória por linha: listas de floats (como os resultados chegam) x TabelaResultados (numpy)
+    from tabela import TabelaResultados
+    colunas = cabecalho_saida(TAGS_PADRAO)[2:]
+    for total in args.linhas:
+        tracemalloc.start()
+        try:
+            linhas = list(linhas_sinteticas(total))
+            mem_lista = tracemalloc.get_traced_memory()[0]
+            del linhas
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            tabela = TabelaResultados(colunas)
+            for linha in linhas_sinteticas(total): tabela.adicionar(linha[0], linha[2:])
+            tabela.valores
+            mem_tabela = tracemalloc.get_traced_memory()[0] - base
+        finally:
+            tracemalloc.stop()
+        inicio = time.perf_counter()
+        tabela.estatisticas()
+        tempo = time.perf_counter() - inicio
+        print(f"{total:7d} linhas: listas {mem_lista / total:7.0f} B/linha, tabela {mem_tabela / total:7.0f} B/linha "
+              f"({mem_lista / mem_tabela:.1f}x menor), estatísticas em {tempo * 1000:.1f} ms")
+
+def _etapa_busca(pasta):
+    return len([caminho for _, caminho in DescobertaArquivos([pasta], ".lis", recursivo=True)])
+
+def _etapa_extracao(arquivos, jobs):
+    # O executor é fechado aqui: o processo da etapa espera os filhos ao sair
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        resultados = extrair_arquivos(arquivos, TAGS_PADRAO, jobs, executor=executor if jobs > 1 else None)
+        return [[caminho, os.path.basename(caminho)] + dados for caminho, erro, dados in resultados if dados]
+
+def _etapa_gravacao(linhas, saida):
+    salvar_dados_fluxo(linhas, saida)
+    return os.path.getsize(saida) / 2**20
+
+def bench_etapas(args):
+    # Mede busca, extração e gravação separadamente sobre o mesmo corpus; cada
+    # etapa roda num processo novo, com o próprio pico de memória
+    pasta = tempfile.mkdtemp(prefix="bench_etapas_")
+    try:
+        arquivos = gerar_corpus(pasta, args, subpastas=10)
+        mb_total = sum(os.path.getsize(a) for a in arquivos) / 2**20
+        print(f"{len(arquivos)} arquivos, {mb_total:.1f} MB, {args.jobs} processo(s)")
+
+        def relatorio(etapa, tempo, quantidade, rss, rss_filhos, mb=None):
+            taxa_mb = f"{mb / tempo:8.1f} MB/s" if mb is not None else " " * 13
+            rss_txt = f"pico RSS {rss:7.1f} MB" if rss is not None else ""
+            if rss_filhos: rss_txt += f" (processos de trabalho {rss_filhos:.1f} MB)"
+            print(f"  {etapa:10s} {tempo:8.3f} s  {quantidade / tempo:9.1f} arquivos/s  {taxa_mb}  {rss_txt}")
+
+        tempo, rss, rss_filhos, encontrados = medir_etapa(_etapa_busca, pasta)
+        relatorio("busca", tempo, encontrados, rss, rss_filhos)
+
+        tempo, rss, rss_filhos, linhas = medir_etapa(_etapa_extracao, arquivos, args.jobs)
+        relatorio("extração", tempo, len(arquivos), rss, rss_filhos, mb_total)
+
+        # O pico da gravação inclui as linhas recebidas, como no lote real antes do fluxo
+        for formato in ("csv", "xlsx"):
+            saida = os.path.join(pasta, f"saida.{formato}")
+            try:
+                tempo, rss, rss_filhos, mb_saida = medir_etapa(_etapa_gravacao, linhas, saida)
+            except ImportError as e:
+                print(f"  gravação {formato}: ignorada ({e})")
+                continue
+            relatorio(f"grav. {formato}", tempo, len(linhas), rss, rss_filhos, mb_saida)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def bench_mmap(args):
+    # Compara a leitura em texto com a busca nos bytes via mmap em arquivos grandes
+    pasta = tempfile.mkdtemp(prefix="bench_mmap_")
+    try:
+        casos = [("com tags", args.blocos), ("sem tags", 0)]
+        for nome, blocos in casos:
+            caminho = os.path.join(pasta, f"grande_{blocos}.lis")
+            gerar_lis_grande(caminho, args.mb, blocos=blocos)
+            mb = os.path.getsize(caminho) / 2**20
+            tempos, resultados = {}, {}
+            for leitura in ("texto", "mmap"):
+                inicio = time.perf_counter()
+                resultados[leitura] = extrair_dados_lis(caminho, TAGS_PADRAO, leitura=leitura)
+                tempos[leitura] = time.perf_counter() - inicio
+            if resultados["texto"] != resultados["mmap"]:
+                raise SystemExit(f"ERRO: resultados divergentes entre texto e mmap ({nome})")
+            print(f"{mb:.0f} MB, {nome}: texto {tempos['texto']:6.2f} s ({mb / tempos['texto']:7.1f} MB/s), "
+                  f"mmap {tempos['mmap']:6.2f} s ({mb / tempos['mmap']:7.1f} MB/s), ganho {tempos['texto'] / tempos['mmap']:.1f}x")
+            os.remove(caminho)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+# --- REGRESSÃO (SAÍDA DE REFERÊNCIA) ---
+# Corpus pequeno e determinístico: (linhas, blocos, faltantes, malformados, seed)
+CORPUS_REGRESSAO = [
+    (2000, 99, 0.0, 0.0, 1),
+    (2000, 99, 0.2, 0.2, 2),
+    (500, 40, 0.1, 0.3, 3),
+    (300, 5, 0.0, 0.0, 4),
+    (200, 0, 0.0, 0.0, 5),
+]
+CENARIOS_REGRESSAO = {
+    "padrao": TAGS_PADRAO,
+    "completo": ["BEGIN WRITE @WRITEMAXMIN # | campos=1-2 | casas=completo"],
+    "arredondar": ["BEGIN WRITE @WRITEMAXMIN # | casas=2 | modo=arredondar | faixa=1-20"],
+    "texto_depois": ["TAG # X"],
+    "numero_livre": ["BEGIN WRITE @WRITEMAXMIN # | numero=livre | faixa=1-12", "TAG # X | numero=livre | nome=Tag"],
+}
+# Formas do número do bloco fora das clássicas, antes das clássicas: com a
+# regra da primeira ocorrência, o '#' padrão precisa ignorá-las
+FORMAS_REGRESSAO = [
+    " BEGIN WRITE @WRITEMAXMIN 10.0", "   7.7",
+    " BEGIN WRITE @WRITEMAXMIN 10.", "   3.3",
+    " BEGIN WRITE @WRITEMAXMIN 5", "   1.2",
+    " BEGIN WRITE @WRITEMAXMIN 5.0", "   2.5",
+    " BEGIN WRITE @WRITEMAXMIN 7.0 X", "   9.9",
+    " BEGIN WRITE @WRITEMAXMIN 7.0", "   6.6",
+    " TAG 3 X", "   5.5",
+    " TAG 3.0", "   4.4",
+]
+
+# Caminhos de leitura comparados com a mesma referência: o padrão (texto,
+# abaixo de 64 MB), a busca nos bytes via mmap e a leitura antecipada
+LEITURAS_REGRESSAO = {
+    'padrao': lambda arquivos, tags: extrair_arquivos(arquivos, tags),
+    'mmap': lambda arquivos, tags: ((c,) + extrair_dados_lis(c, tags, leitura='mmap') for c in arquivos),
+    'antecipada': lambda arquivos, tags: PipelineExtracao(tags, 1, 4, 2).extrair(arquivos),
+}
+
+def resultados_regressao(leituras=LEITURAS_REGRESSAO):
+    # {leitura: {cenário: {arquivo: [erro, dados]}}}
+    pasta = tempfile.mkdtemp(prefix="regressao_lis_")
+    try:
+        arquivos = []
+        for linhas, blocos, faltantes, malformados, seed in CORPUS_REGRESSAO:
+            caminho = os.path.join(pasta, f"regressao_{seed:02d}.lis")
+            gerar_lis(caminho, linhas, blocos=blocos, seed=seed, faltantes=faltantes, malformados=malformados)
+            arquivos.append(caminho)
+        caminho = os.path.join(pasta, "regressao_formas.lis")
+        with open(caminho, 'w', encoding='latin-1') as f: f.write("\n".join(FORMAS_REGRESSAO) + "\n")
+        arquivos.append(caminho)
+        return {leitura: {nome: {os.path.basename(caminho): [erro, dados] for caminho, erro, dados in extrair(arquivos, tags)}
+                          for nome, tags in CENARIOS_REGRESSAO.items()}
+                for leitura, extrair in leituras.items()}
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def regressao(args):
+    # Compara a extração atual com a saída de referência gravada no repositório
+    if args.atualizar:
+        atuais = json.loads(json.dumps(resultados_regressao({'padrao': LEITURAS_REGRESSAO['padrao']})['padrao']))
+        # Uma linha por arquivo, para as diferenças ficarem legíveis no git diff
+        blocos = []
+        for cenario, arquivos in atuais.items():
+            itens = ",\n".join(f"  {json.dumps(nome)}: {json.dumps(valor, ensure_ascii=False)}" for nome, valor in arquivos.items())
+            blocos.append(f" {json.dumps(cenario)}: {{\n{itens}\n }}")
+        with open(REFERENCIA_REGRESSAO, 'w', encoding='utf-8') as f:
+            f.write("{\n" + ",\n".join(blocos) + "\n}\n")
+        print(f"Referência atualizada: {REFERENCIA_REGRESSAO}")
+        return
+    with open(REFERENCIA_REGRESSAO, encoding='utf-8') as f:
+        referencia = json.load(f)
+    divergencias = total = 0
+    for leitura, atuais in json.loads(json.dumps(resultados_regressao())).items():
+        for cenario in sorted(set(referencia) | set(atuais)):
+            esperado, obtido = referencia.get(cenario, {}), atuais.get(cenario, {})
+            total += len(obtido)
+            for arquivo in sorted(set(esperado) | set(obtido)):
+                if esperado.get(arquivo) != obtido.get(arquivo):
+                    divergencias += 1
+                    print(f"DIVERGÊNCIA [{leitura}/{cenario}] {arquivo}:\n  esperado {esperado.get(arquivo)}\n  obtido   {obtido.get(arquivo)}")
+    if divergencias:
+        raise SystemExit(f"ERRO: {divergencias} resultado(s) diferente(s) da referência")
+    print(f"OK: {total} resultados iguais à referência ({', '.join(LEITURAS_REGRESSAO)})")
+
+def bench_paralelo(args):
+    pasta = tempfile.mkdtemp(prefix="bench_lis_")
+    try:
+        arquivos = gerar_corpus(pasta, args)
+        total = os.cpu_count() or 1
+        niveis = sorted({n for n in (1, 2, 4, total) if n <= total})
+        print(f"{args.arquivos} arquivos x {args.linhas} linhas")
+        referencia = None
+        for workers in niveis:
+            inicio = time.perf_counter()
+            resultados = list(extrair_arquivos(arquivos, TAGS_PADRAO, workers))
+            tempo = time.perf_counter() - inicio
+            if referencia is None: referencia = resultados
+            elif resultados != referencia:
+                raise SystemExit(f"ERRO: resultados divergentes com {workers} processos")
+            print(f"  {workers:3d} processo(s): {len(arquivos) / tempo:8.1f} arquivos/s")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def bench_pipeline(args):
+    # Leitura sequencial x leitura antecipada com latência simulada na abertura
+    # de cada arquivo (como numa pasta de rede). A latência só vale no processo
+    # principal, por isso a extração usa um processo (-j 1).
+    pasta = tempfile.mkdtemp(prefix="bench_pipeline_")
+    abrir = open
+    try:
+        arquivos = gerar_corpus(pasta, args)
+        print(f"{args.arquivos} arquivos x {args.linhas} linhas, leitura antecipada de {args.antecipacao} com {args.threads} thread(s)")
+        for latencia in args.latencia:
+            def abrir_lento(*a, **k):
+                time.sleep(latencia / 1000)
+                return abrir(*a, **k)
+            extrator.open = abrir_lento
+            try:
+                inicio = time.perf_counter()
+                sequencial = list(extrair_arquivos(arquivos, TAGS_PADRAO, 1))
+                tempo_seq = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                pipeline = list(PipelineExtracao(TAGS_PADRAO, 1, args.antecipacao, args.threads).extrair(arquivos))
+                tempo_pip = time.perf_counter() - inicio
+            finally:
+                del extrator.open
+            if pipeline != sequencial:
+                raise SystemExit(f"ERRO: resultados divergentes com latência de {latencia} ms")
+            print(f"  {latencia:4d} ms: sequencial {len(arquivos) / tempo_seq:8.1f} arquivos/s, "
+                  f"antecipada {len(arquivos) / tempo_pip:8.1f} arquivos/s ({tempo_seq / tempo_pip:.1f}x)")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do extrator de dados .lis")
+    sub = parser.add_subparsers(dest="modo", required=True)
+    for nome, funcao, arquivos, linhas in [("extracao", bench_extracao, 5, 200000), ("paralelo", bench_paralelo, 200, 20000),
+                                           ("etapas", bench_etapas, 200, 20000)]:
+        p = sub.add_parser(nome)
+        p.add_argument("--arquivos", type=int, default=arquivos)
+        p.add_argument("--linhas", type=int, default=linhas)
+        p.add_argument("--blocos", type=int, default=99)
+        p.add_argument("--faltantes", type=float, default=0.0, help="Fração de valores ausentes")
+        p.add_argument("--malformados", type=float, default=0.0, help="Fração de valores malformados")
+        p.set_defaults(funcao=funcao)
+    sub.choices["etapas"].add_argument("-j", "--jobs", type=int, default=1)
+    p = sub.add_parser("mmap", help="Leitura em texto x mmap em arquivos grandes")
+    p.add_argument("--mb", type=int, default=200)
+    p.add_argument("--blocos", type=int, default=99)
+    p.set_defaults(funcao=bench_mmap)
+    p = sub.add_parser("regressao", help="Compara a extração com a saída de referência")
+    p.add_argument("--atualizar", action='store_true', help="Regrava a referência com os resultados atuais")
+    p.set_defaults(funcao=regressao)
+    p = sub.add_parser("gerar", help="Gera um corpus sintético numa pasta")
+    p.add_argument("pasta")
+    p.add_argument("--arquivos", type=int, default=100)
+    p.add_argument("--linhas", type=int, default=20000)
+    p.add_argument("--blocos", type=int, default=99)
+    p.add_argument("--faltantes", type=float, default=0.0)
+    p.add_argument("--malformados", type=float, default=0.0)
+    p.add_argument("--subpastas", type=int, default=1)
+    p.set_defaults(funcao=lambda args: print(f"{len(gerar_corpus(args.pasta, args, args.subpastas))} arquivos gerados em {args.pasta}"))
+    p = sub.add_parser("saida")
+    p.add_argument("--linhas", type=int, nargs='+', default=[10000, 100000])
+    p.add_argument("--formato", choices=["xlsx", "csv"], default="xlsx")
+    p.set_defaults(funcao=bench_saida)
+    p = sub.add_parser("pipeline", help="Leitura sequencial x antecipada com latência de rede simulada")
+    p.add_argument("--arquivos", type=int, default=100)
+    p.add_argument("--linhas", type=int, default=5000)
+    p.add_argument("--blocos", type=int, default=99)
+    p.add_argument("--latencia", type=int, nargs='+', default=[0, 10, 30], help="Atraso por abertura de arquivo, em ms")
+    p.add_argument("--antecipacao", type=int, default=8)
+    p.add_argument("--threads", type=int, default=4)
+    p.set_defaults(funcao=bench_pipeline)
+    p = sub.add_parser("tabela")
+    p.add_argument("--linhas", type=int, nargs='+', default=[10000, 100000])
+    p.set_defaults(funcao=bench_tabela)
+    args = parser.parse_args()
+    args.funcao(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import json
+import time
+import hashlib
+import sqlite3
+
+CACHE_FILE = 'extrator_cache.sqlite'
+MAX_ENTRADAS_PADRAO = 200000
+# Entra na chave das entradas: mude quando a extração passar a dar outros
+# valores para o mesmo arquivo e as mesmas tags (as entradas antigas deixam de
+# ser usadas e saem pelo limite de entradas)
+VERSAO_EXTRACAO = 2
+
+def hash_tags(tags_template):
+    return hashlib.sha1("\n".join([f"v{VERSAO_EXTRACAO}"] + list(tags_template)).encode('utf-8')).hexdigest()
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    # Lido em blocos para não carregar o arquivo inteiro na memória
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+# --- CACHE DE RESULTADOS ---
+class CacheExtracao:
+    # Resultados de extrair_dados_lis guardados em SQLite, por caminho e conjunto
+    # de tags. Uma entrada só vale se tamanho e mtime do arquivo não mudaram
+    # (ou, com verificar_conteudo, se o conteúdo ainda tem o mesmo hash).
+    # O tamanho é limitado descartando as entradas usadas há mais tempo (LRU).
+    # As escritas só são confirmadas em salvar(), que quem usa o cache chama a
+    # cada janela de arquivos, para não segurar o banco (que pode ser o mesmo
+    # de uma observação de pastas em andamento). Um erro do SQLite (ex.: banco
+    # travado por outro processo) desliga o cache: 'erro' guarda o motivo e
+    # buscar() passa a não encontrar nada.
+    def __init__(self, path=CACHE_FILE, tags_template=(), max_entradas=MAX_ENTRADAS_PADRAO, verificar_conteudo=False):
+        self.path = path
+        self.tags = hash_tags(tags_template)
+        self.max_entradas = max_entradas
+        self.verificar_conteudo = verificar_conteudo
+        self.hits = self.misses = 0
+        self.erro = None
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS resultados (
+            caminho TEXT NOT NULL, tags TEXT NOT NULL, tamanho INTEGER, mtime_ns INTEGER,
+            hash_conteudo TEXT, erro TEXT, dados TEXT, acesso REAL,
+            PRIMARY KEY (caminho, tags))""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados (acesso)")
+
+    def _desligar(self, e):
+        self.erro = str(e)
+        try:
+            self.conn.rollback()
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+        self.conn = None
+
+    def buscar(self, caminho, st):
+        # Retorna (erro, dados) se houver resultado válido, senão None
+        if self.conn is None:
+            self.misses += 1
+            return None
+        try:
+            return self._buscar(caminho, st)
+        except sqlite3.Error as e:
+            self._desligar(e)
+        except OSError:
+            pass # Conteúdo ilegível para o hash: o arquivo é extraído de novo
+        self.misses += 1
+        return None
+
+    def _buscar(self, caminho, st):
+        linha = self.conn.execute(
+            "SELECT tamanho, mtime_ns, hash_conteudo, erro, dados FROM resultados WHERE caminho = ? AND tags = ?",
+            (caminho, self.tags)).fetchone()
+        if linha is None:
+            self.misses += 1
+            return None
+        tamanho, mtime_ns, hash_conteudo, erro, dados = linha
+        if (tamanho, mtime_ns) != (st.st_size, st.st_mtime_ns):
+            if not (self.verificar_conteudo and hash_conteudo and tamanho == st.st_size and hash_conteudo == hash_arquivo(caminho)):
+                # Entrada desatualizada: o arquivo mudou desde a última extração
+                self.conn.execute("DELETE FROM resultados WHERE caminho = ? AND tags = ?", (caminho, self.tags))
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE resultados SET mtime_ns = ? WHERE caminho = ? AND tags = ?", (st.st_mtime_ns, caminho, self.tags))
+        self.conn.execute("UPDATE resultados SET acesso = ? WHERE caminho = ? AND tags = ?", (time.time(), caminho, self.tags))
+        self.hits += 1
+        return erro, (json.loads(dados) if dados is not None else None)
+
+    def guardar(self, caminho, st, erro, dados):
+        if self.conn is None: return
+        try:
+            hash_conteudo = hash_arquivo(caminho) if self.verificar_conteudo else None
+        except OSError:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (caminho, self.tags, st.st_size, st.st_mtime_ns, hash_conteudo, erro,
+                 json.dumps(dados) if dados is not None else None, time.time()))
+        except sqlite3.Error as e:
+            self._desligar(e)
+
+    def salvar(self):
+        # Confirma as escritas pendentes e libera o banco para outros processos
+        if self.conn is None: return
+        try:
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self._desligar(e)
+
+    def limitar(self):
+        # Remove as entradas menos usadas recentemente além de max_entradas
+        total = self.conn.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        excesso = total - self.max_entradas
+        if excesso > 0:
+            self.conn.execute("DELETE FROM resultados WHERE rowid IN (SELECT rowid FROM resultados ORDER BY acesso LIMIT ?)", (excesso,))
+        return max(0, excesso)
+
+    def fechar(self):
+        if self.conn is None: return
+        try:
+            self.limitar()
+            self.conn.commit()
+            self.conn.close()
+        except sqlite3.Error as e:
+            self._desligar(e)
+        self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
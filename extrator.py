@@ -0,0 +1,1214 @@
+import io
+import os
+import re
+import csv
+import time
+import mmap
+import cProfile
+import heapq
+import queue
+import fnmatch
+import logging
+import functools
+import threading
+import multiprocessing
+from multiprocessing.connection import wait as aguardar_conexoes
+from collections import deque
+from itertools import groupby, islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from cache import CacheExtracao, hash_arquivo
+from instrumentacao import MedidorEtapas, medidas_vazias
+
+# --- CASAMENTO DE TAGS ---
+# Sintaxe de um template: "<tag>[ | opção=valor ...]"
+#   <tag>       texto exato da linha; '#' marca o número do bloco, nas formas
+#               clássicas 1.0 ... 9.0, 10. ... 99. (o texto depois do '#' é ignorado)
+#               ou, com o prefixo 're:', uma expressão regular para a linha inteira
+#               (o primeiro grupo, se houver, é o número do bloco)
+#   campos=     colunas da linha seguinte a capturar: 1 | 1,3 | 1-6 | linha (texto inteiro)
+#   casas=      casas decimais mantidas (padrão 1) ou 'completo' para a precisão total
+#   modo=       'truncar' (padrão) ou 'arredondar' as casas decimais
+#   faixa=      faixa de números de bloco aceitos pelo '#' (padrão 1-99)
+#   nome=       prefixo das colunas na saída (padrão 'Valor')
+#   numero=     'classico' (padrão) ou 'livre': o '#' aceita 1, 1.0, 10, 10., 10.00
+#               e o texto depois do '#' precisa estar na linha
+OPCOES_TEMPLATE = ('campos', 'casas', 'modo', 'faixa', 'nome', 'numero')
+_RE_OPCAO = re.compile(r"\s*(%s)\s*=\s*(.*?)\s*$" % "|".join(OPCOES_TEMPLATE))
+
+def expandir_tags(tags_template):
+    # Formas clássicas de cada '#': base1.0 ... base9.0, base10. ... base99.
+    all_tags_to_search = []
+    for template in tags_template:
+        if "#" in template:
+            base = template.split('#')[0]
+            all_tags_to_search.extend([f"{base}{i}.0" for i in range(1, 10)])
+            all_tags_to_search.extend([f"{base}{i}." for i in range(10, 100)])
+        else:
+            all_tags_to_search.append(template)
+    return all_tags_to_search
+
+def _converter_valor(token, casas=1, modo='truncar'):
+    try:
+        if casas is None: return float(token)
+        if modo == 'arredondar': return round(float(token), casas)
+        if '.' in token: token = token[:token.find('.') + 1 + casas]
+        if token: return float(token)
+    except ValueError: pass
+    return None
+
+def converter_numero(linha_com_numero):
+    # Primeiro número da linha, truncado em uma casa decimal
+    tokens = linha_com_numero.split()
+    return _converter_valor(tokens[0]) if tokens else None
+
+def _faixa(texto):
+    inicio, _, fim = texto.partition('-')
+    inicio, fim = int(inicio), int(fim or inicio)
+    if inicio > fim: raise ValueError
+    return inicio, fim
+
+class TemplateTag:
+    # Um template já compilado: como reconhecer a linha da tag e o que capturar
+    # da linha seguinte. Cada número de bloco ocupa 'largura' posições na saída.
+    def __init__(self, texto, nome_padrao='Valor'):
+        self.texto = texto
+        partes = texto.split('|')
+        opcoes = {}
+        while len(partes) > 1 and _RE_OPCAO.match(partes[-1]):
+            chave, valor = _RE_OPCAO.match(partes.pop()).groups()
+            opcoes[chave] = valor
+        padrao = '|'.join(partes).rstrip() if opcoes else texto
+        try:
+            self.campos = self._campos(opcoes.get('campos', '1'))
+            casas = opcoes.get('casas', '1').lower()
+            self.casas = None if casas in ('completo', 'todas') else int(casas)
+            if self.casas is not None and self.casas < 0: raise ValueError
+            self.modo = opcoes.get('modo', 'truncar').lower()
+            if self.modo not in ('truncar', 'arredondar'): raise ValueError
+            self.inicio, self.fim = _faixa(opcoes.get('faixa', '1-99'))
+            numero = opcoes.get('numero', 'classico').lower()
+            if numero not in ('classico', 'livre'): raise ValueError
+        except ValueError:
+            raise ValueError(f"opções inválidas no template: {texto}") from None
+        self.largura = len(self.campos) if self.campos else 1
+        self.literal = self.regex = self.prefixo = None
+        self.indexado = False
+        if padrao.startswith('re:'):
+            try:
+                self.regex = re.compile(padrao[3:])
+            except re.error as e:
+                raise ValueError(f"expressão regular inválida no template: {texto} ({e})") from None
+            self.indexado = self.regex.groups >= 1
+        elif '#' in padrao:
+            base, sufixo = padrao.split('#', 1)
+            if numero == 'livre':
+                self.regex = re.compile(re.escape(base) + r"(\d+)(?:\.0*)?" + re.escape(sufixo))
+            else:
+                # Como expandir_tags: base1.0 ... base9.0, base10. em diante
+                self.regex = re.compile(re.escape(base) + r"(?=[1-9]\.0$|[1-9]\d+\.$)(\d+)\.0?")
+            self.prefixo = base
+            self.indexado = True
+        else:
+            self.literal = self.prefixo = padrao
+        self.nome = opcoes.get('nome') or (nome_padrao if self.indexado else padrao.removeprefix('re:'))
+        self.total_slots = (self.fim - self.inicio + 1) * self.largura if self.indexado else self.largura
+
+    @staticmethod
+    def _campos(texto):
+        if texto.lower() == 'linha': return None
+        campos = []
+        for parte in texto.split(','):
+            inicio, fim = _faixa(parte.strip())
+            if inicio < 1: raise ValueError
+            campos.extend(range(inicio, fim + 1))
+        return campos
+
+    def colunas(self):
+        sufixos = [f"_{c}" for c in self.campos] if self.campos and len(self.campos) > 1 else [""]
+        if not self.indexado:
+            return [f"{self.nome}{s}" for s in sufixos]
+        return [f"{self.nome}_{i}{s}" for i in range(self.inicio, self.fim + 1) for s in sufixos]
+
+    def capturar(self, linha):
+        # Valores da linha seguinte à tag, já na precisão configurada
+        if self.campos is None: return [linha or None]
+        tokens = linha.split()
+        return [_converter_valor(tokens[c - 1], self.casas, self.modo) if c <= len(tokens) else None for c in self.campos]
+
+class CasadorTags:
+    # Templates compilados uma vez por conjunto de tags: linhas exatas ficam num
+    # dicionário e as com '#' ou 're:' em expressões regulares, filtradas antes
+    # por prefixo. Permite extrair todas as tags percorrendo o arquivo uma vez.
+    def __init__(self, tags_template):
+        self.tags_template = list(tags_template)
+        self.templates = []
+        indexados = 0
+        for texto in self.tags_template:
+            nome_padrao = 'Valor'
+            if '#' in texto or texto.startswith('re:'):
+                indexados += 1
+                if indexados > 1: nome_padrao = f'Valor_T{indexados}'
+            self.templates.append(TemplateTag(texto, nome_padrao))
+        self.prefixos = [t.prefixo for t in self.templates if t.prefixo is not None]
+        self.colunas = []
+        self.literais = {}
+        self.indexados = []
+        self.total_chaves = 0
+        self.colunas_texto = [] # Posições capturadas com campos=linha
+        for t in self.templates:
+            t.base = len(self.colunas)
+            if t.campos is None: self.colunas_texto.extend(range(t.base, t.base + t.total_slots))
+            self.colunas.extend(t.colunas())
+            if t.indexado:
+                self.indexados.append(t)
+                self.total_chaves += t.fim - t.inicio + 1
+            else:
+                self.literais.setdefault(t.literal if t.literal is not None else None, []).append(t)
+                self.total_chaves += 1
+        # Templates 're:' sem grupo casam a linha inteira, mas ocupam uma só posição
+        self.regex_simples = self.literais.pop(None, [])
+        self.total_slots = len(self.colunas)
+        com_prefixo = all(t.prefixo is not None for t in self.indexados)
+        self.filtro = tuple(t.prefixo for t in self.indexados) if com_prefixo else None
+        # A busca direta nos bytes só é possível se toda tag tiver um prefixo fixo
+        self.prefixos_bytes = None
+        if com_prefixo and not self.regex_simples and all(self.prefixos):
+            try:
+                self.prefixos_bytes = [p.encode('latin-1') for p in dict.fromkeys(self.prefixos)]
+            except UnicodeEncodeError:
+                pass
+
+    def _casar(self, linha, encontrados):
+        # Retorna [(template, slot)] das tags que aparecem pela primeira vez nesta linha
+        alvos = []
+        for t in self.literais.get(linha, ()):
+            if id(t) not in encontrados:
+                encontrados.add(id(t))
+                alvos.append((t, t.base))
+        for t in self.regex_simples:
+            if id(t) not in encontrados and t.regex.fullmatch(linha):
+                encontrados.add(id(t))
+                alvos.append((t, t.base))
+        if self.indexados and (self.filtro is None or linha.startswith(self.filtro)):
+            for t in self.indexados:
+                m = t.regex.fullmatch(linha)
+                if not m: continue
+                try:
+                    indice = int(m.group(1))
+                except (TypeError, ValueError): # Grupo opcional que não participou do casamento
+                    continue
+                chave = (id(t), indice)
+                if not t.inicio <= indice <= t.fim or chave in encontrados: continue
+                encontrados.add(chave)
+                alvos.append((t, t.base + (indice - t.inicio) * t.largura))
+        return alvos
+
+    def extrair(self, linhas, medidas=None):
+        # Percorre as linhas em fluxo, guardando apenas as tags à espera da
+        # próxima linha. Apenas a primeira ocorrência de cada tag vale.
+        # Retorna (arquivo_valido, numeros_encontrados). Com 'medidas', soma
+        # em medidas['parse'] o tempo de conversão dos valores.
+        numeros_encontrados = [None] * self.total_slots
+        encontrados = set()
+        pendentes = None
+        valido = False
+        literais, filtro = self.literais, self.filtro
+        # Sem filtro por prefixo (há 're:'), toda linha precisa ser testada
+        testar_todas = bool(self.regex_simples) or (bool(self.indexados) and filtro is None)
+        if filtro is None: filtro = ()
+        for linha in linhas:
+            if not valido:
+                valido = any(prefixo in linha for prefixo in self.prefixos)
+            linha = linha.strip()
+            if pendentes:
+                if medidas is not None: inicio = time.perf_counter()
+                for t, slot in pendentes: numeros_encontrados[slot:slot + t.largura] = t.capturar(linha)
+                if medidas is not None: medidas['parse'] += time.perf_counter() - inicio
+                pendentes = None
+                if len(encontrados) == self.total_chaves: break
+            if testar_todas or linha in literais or linha.startswith(filtro):
+                pendentes = self._casar(linha, encontrados)
+                if pendentes: valido = True
+        return valido, numeros_encontrados
+
+    def extrair_bytes(self, mm, medidas=None):
+        # Mesmo resultado de extrair(), mas procurando os prefixos direto nos
+        # bytes (ex.: um mmap). Só as linhas com prefixo e as seguintes são
+        # decodificadas. As ocorrências dos vários prefixos são visitadas em
+        # ordem de posição, para manter a regra da primeira ocorrência.
+        numeros_encontrados = [None] * self.total_slots
+        encontrados = set()
+        tamanho = len(mm)
+        ocorrencias = []
+        for i, prefixo in enumerate(self.prefixos_bytes):
+            pos = mm.find(prefixo)
+            if pos >= 0: ocorrencias.append((pos, i))
+        heapq.heapify(ocorrencias)
+        valido = bool(ocorrencias)
+        ultimo_inicio = -1
+        while ocorrencias:
+            pos, i = heapq.heappop(ocorrencias)
+            inicio, fim = _inicio_linha(mm, pos), _fim_linha(mm, pos, tamanho)
+            seguinte = mm.find(self.prefixos_bytes[i], fim)
+            if seguinte >= 0: heapq.heappush(ocorrencias, (seguinte, i))
+            if inicio == ultimo_inicio: continue
+            ultimo_inicio = inicio
+            alvos = self._casar(mm[inicio:fim].decode('latin-1').strip(), encontrados)
+            if not alvos: continue
+            proxima = _proxima_linha(mm, fim, tamanho)
+            if proxima is not None:
+                if medidas is not None: inicio_parse = time.perf_counter()
+                linha = mm[proxima[0]:proxima[1]].decode('latin-1').strip()
+                for t, slot in alvos: numeros_encontrados[slot:slot + t.largura] = t.capturar(linha)
+                if medidas is not None: medidas['parse'] += time.perf_counter() - inicio_parse
+            if len(encontrados) == self.total_chaves: break
+        return valido, numeros_encontrados
+
+# Limites de linha nos bytes, com as mesmas quebras do modo texto (\n, \r\n e \r)
+def _inicio_linha(mm, pos):
+    nl = mm.rfind(b'\n', 0, pos)
+    return max(nl, mm.rfind(b'\r', nl + 1, pos)) + 1
+
+def _fim_linha(mm, pos, tamanho):
+    nl = mm.find(b'\n', pos)
+    if nl < 0: nl = tamanho
+    cr = mm.find(b'\r', pos, nl)
+    return cr if cr >= 0 else nl
+
+def _proxima_linha(mm, fim, tamanho):
+    inicio = fim + 2 if mm[fim:fim + 2] == b'\r\n' else fim + 1
+    if inicio >= tamanho: return None
+    return inicio, _fim_linha(mm, inicio, tamanho)
+
+@functools.lru_cache(maxsize=32)
+def compilar_tags(tags_template):
+    return CasadorTags(tags_template)
+
+# --- LÓGICA PRINCIPAL ---
+ERRO_ARQUIVO_INVALIDO = "Arquivo inválido (não contém tags esperadas)"
+
+LIMIAR_MMAP = 64 * 2**20 # A partir deste tamanho, 'auto' busca direto nos bytes
+
+def _linhas_medidas(f, medidas, tamanho_bloco=1 << 16):
+    # Lê em blocos de linhas para medir a leitura sem um relógio por linha
+    while True:
+        inicio = time.perf_counter()
+        bloco = f.readlines(tamanho_bloco)
+        medidas['read'] += time.perf_counter() - inicio
+        if not bloco: return
+        yield from bloco
+
+def extrair_dados_lis(caminho_arquivo, tags_template, leitura='auto', medidas=None):
+    # Leitura única e em fluxo: a memória não cresce com o tamanho do arquivo.
+    # leitura: 'texto' decodifica linha a linha; 'mmap' mapeia o arquivo e só
+    # decodifica as linhas das tags; 'auto' usa mmap nos arquivos grandes.
+    # medidas (ver instrumentacao.medidas_vazias) recebe bytes e os tempos de
+    # leitura, busca das tags e conversão. Com mmap a leitura acontece durante
+    # a busca, então 'read' conta só a abertura e o mapeamento.
+    casador = compilar_tags(tuple(tags_template))
+    if medidas is not None: inicio = time.perf_counter()
+    try:
+        tamanho = None
+        if medidas is not None or (leitura == 'auto' and casador.prefixos_bytes is not None):
+            tamanho = os.path.getsize(caminho_arquivo)
+            if medidas is not None: medidas['bytes'] = tamanho
+        usar_mmap = casador.prefixos_bytes is not None and (
+            leitura == 'mmap' or (leitura == 'auto' and tamanho >= LIMIAR_MMAP))
+        if usar_mmap:
+            with open(caminho_arquivo, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    valido, numeros_encontrados = casador.extrair(())
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if medidas is not None: medidas['read'] = time.perf_counter() - inicio
+                        valido, numeros_encontrados = casador.extrair_bytes(mm, medidas)
+        else:
+            with open(caminho_arquivo, 'r', encoding='latin-1', errors='ignore') as f:
+                linhas = _linhas_medidas(f, medidas) if medidas is not None else f
+                valido, numeros_encontrados = casador.extrair(linhas, medidas)
+    except Exception as e:
+        if medidas is not None: medidas['total'] = time.perf_counter() - inicio
+        return f"Não foi possível ler o arquivo: {e}", None
+    if medidas is not None:
+        medidas['total'] = time.perf_counter() - inicio
+        medidas['match'] = max(0.0, medidas['total'] - medidas['read'] - medidas['parse'])
+    if not valido:
+        return ERRO_ARQUIVO_INVALIDO, None
+    return None, numeros_encontrados
+
+def extrair_dados_lis_medido(caminho_arquivo, tags_template):
+    # Versão usada pelos processos de trabalho quando o lote é instrumentado
+    medidas = medidas_vazias()
+    erro, dados = extrair_dados_lis(caminho_arquivo, tags_template, medidas=medidas)
+    return erro, dados, medidas
+
+# --- MOTOR DE EXTRAÇÃO PARALELA ---
+def _extrair_lote(caminhos, tags_template, medir=False):
+    extrair = extrair_dados_lis_medido if medir else extrair_dados_lis
+    return [extrair(caminho, tags_template) for caminho in caminhos]
+
+def _repassar(caminho, resultado, medidor):
+    # Separa as medidas do resultado de um processo de trabalho instrumentado
+    if medidor is None: return (caminho,) + tuple(resultado)
+    erro, dados, medidas = resultado
+    medidor.registrar_extracao(caminho, medidas)
+    return caminho, erro, dados
+
+def _aguardar(futuro, cancel_event):
+    # Espera o resultado sem deixar de atender ao cancelamento
+    while True:
+        if cancel_event is not None and cancel_event.is_set(): return None
+        try:
+            return futuro.result(timeout=0.1)
+        except FuturesTimeoutError:
+            pass
+
+def _entregar_lote(pendente, cancel_event, medidor=None):
+    # Repassa os resultados de um lote; retorna False se houve cancelamento
+    lote, futuro = pendente
+    resultados = _aguardar(futuro, cancel_event)
+    if resultados is None: return False
+    for caminho, resultado in zip(lote, resultados):
+        if cancel_event is not None and cancel_event.is_set(): return False
+        yield _repassar(caminho, resultado, medidor)
+    return True
+
+def extrair_arquivos(arquivos, tags_template, workers=1, tamanho_lote=None, cancel_event=None, executor=None, medidor=None):
+    # Gera (caminho, erro, dados) para cada arquivo, sempre na ordem original.
+    # Um executor já aberto pode ser reaproveitado entre chamadas (ex.: uma por pasta).
+    # 'arquivos' pode ser qualquer iterável, inclusive a própria busca em andamento.
+    # Com um MedidorEtapas, os tempos de cada arquivo são registrados nele.
+    tags_template = list(tags_template)
+    medir = medidor is not None
+    conhecidos = isinstance(arquivos, (list, tuple))
+    if workers <= 1 or (conhecidos and len(arquivos) <= 1):
+        extrair = extrair_dados_lis_medido if medir else extrair_dados_lis
+        for caminho in arquivos:
+            if cancel_event is not None and cancel_event.is_set(): return
+            yield _repassar(caminho, extrair(caminho, tags_template), medidor)
+        return
+    if not tamanho_lote:
+        tamanho_lote = max(1, min(32, len(arquivos) // (workers * 4))) if conhecidos else 8
+    arquivos = iter(arquivos)
+    lotes = iter(lambda: list(islice(arquivos, tamanho_lote)), [])
+    executor_proprio = executor is None
+    if executor_proprio: executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # No máximo dois lotes por processo em andamento, para limitar a memória
+        pendentes = deque()
+        for lote in lotes:
+            pendentes.append((lote, executor.submit(_extrair_lote, lote, tags_template, medir)))
+            if len(pendentes) < workers * 2: continue
+            if not (yield from _entregar_lote(pendentes.popleft(), cancel_event, medidor)): return
+        while pendentes:
+            if not (yield from _entregar_lote(pendentes.popleft(), cancel_event, medidor)): return
+    finally:
+        if executor_proprio:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for _, futuro in pendentes: futuro.cancel()
+
+# --- LEITURA ANTECIPADA EM ETAPAS ---
+def _ler_conteudo(caminho):
+    # Etapa de leitura: retorna (conteudo, erro, segundos, bytes). Arquivos a
+    # partir de LIMIAR_MMAP ficam com conteudo None e são lidos por mmap na análise.
+    inicio = time.perf_counter()
+    try:
+        tamanho = os.path.getsize(caminho)
+        if tamanho >= LIMIAR_MMAP: return None, None, 0.0, tamanho
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+    except OSError as e:
+        return None, f"Não foi possível ler o arquivo: {e}", time.perf_counter() - inicio, 0
+    return conteudo, None, time.perf_counter() - inicio, len(conteudo)
+
+def extrair_conteudo(caminho_arquivo, conteudo, tags_template, medidas=None):
+    # extrair_dados_lis sobre o arquivo já lido em bytes (conteudo None lê do disco)
+    if conteudo is None: return extrair_dados_lis(caminho_arquivo, tags_template, medidas=medidas)
+    casador = compilar_tags(tuple(tags_template))
+    inicio = time.perf_counter()
+    try:
+        if casador.prefixos_bytes is not None:
+            valido, numeros_encontrados = casador.extrair_bytes(conteudo, medidas)
+        else:
+            valido, numeros_encontrados = casador.extrair(io.StringIO(conteudo.decode('latin-1'), newline=None), medidas)
+    except Exception as e:
+        return f"Não foi possível ler o arquivo: {e}", None
+    finally:
+        if medidas is not None:
+            medidas['total'] = time.perf_counter() - inicio
+            medidas['match'] = max(0.0, medidas['total'] - medidas['parse'])
+    if not valido:
+        return ERRO_ARQUIVO_INVALIDO, None
+    return None, numeros_encontrados
+
+def _extrair_conteudos(lote, tags_template, medir=False):
+    # lote: [(caminho, conteudo)]; mesmo formato de resultado de _extrair_lote
+    resultados = []
+    for caminho, conteudo in lote:
+        if not medir:
+            resultados.append(extrair_conteudo(caminho, conteudo, tags_template))
+            continue
+        medidas = medidas_vazias()
+        resultados.append(extrair_conteudo(caminho, conteudo, tags_template, medidas) + (medidas,))
+    return resultados
+
+class PipelineExtracao:
+    # Busca, leitura, análise e gravação em etapas que se sobrepõem, ligadas
+    # por filas limitadas: enquanto um arquivo é analisado, os próximos
+    # 'leitura_antecipada' já estão sendo lidos por 'threads_leitura' threads,
+    # escondendo a latência de compartilhamentos de rede (SMB/NFS). A análise
+    # roda numa thread própria (ou no executor de processos, com workers > 1)
+    # e quem consome o gerador (a gravação) recebe os resultados na ordem
+    # original. 'leitura_antecipada' limita também a memória: conta tanto os
+    # arquivos lidos à espera da análise quanto os que estão nos processos.
+    # O cancelamento devolve o controle em no máximo 0,1 s: as esperas
+    # acompanham 'parar', e um arquivo que está sendo analisado na thread
+    # (com um processo) termina em segundo plano, com o resultado descartado.
+    INTERVALO_VERIFICACAO = 0.1
+    _FIM = object()
+
+    def __init__(self, tags_template, workers=1, leitura_antecipada=8, threads_leitura=4, cancel_event=None, executor=None, medidor=None):
+        self.tags_template = list(tags_template)
+        self.workers = workers
+        self.leitura_antecipada = max(1, leitura_antecipada)
+        self.threads_leitura = max(1, threads_leitura)
+        self.cancel_event = cancel_event
+        self.executor = executor
+        self.medidor = medidor
+
+    def _cancelado(self, parar):
+        return parar.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+    def _colocar(self, saida, item, parar):
+        while not self._cancelado(parar):
+            try:
+                saida.put(item, timeout=self.INTERVALO_VERIFICACAO)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _analisar(self, arquivos, saida, parar, leitores):
+        # Etapa de análise: consome as leituras em ordem e entrega (caminho, erro, dados)
+        medir = self.medidor is not None
+        lidos = deque() # (caminho, futuro da leitura)
+        analisando = deque() # (itens do lote, futuro da análise), só com processos
+        lote = []
+        # Lotes menores com poucos arquivos antecipados, para ocupar todos os processos
+        tamanho_lote = max(1, min(4, self.leitura_antecipada // max(1, self.workers)))
+
+        def em_memoria():
+            return len(lidos) + len(lote) + sum(len(itens) for itens, _ in analisando)
+
+        def entregar(itens, resultados):
+            for (caminho, tempo_leitura, tamanho), resultado in zip(itens, resultados):
+                if self._cancelado(parar): return False
+                if medir:
+                    resultado[2]['read'] += tempo_leitura
+                    resultado[2]['total'] += tempo_leitura
+                    resultado[2]['bytes'] = tamanho
+                if not self._colocar(saida, _repassar(caminho, resultado, self.medidor), parar): return False
+            return True
+
+        def analisar_lido(caminho, futuro):
+            conteudo, erro, tempo_leitura, tamanho = _aguardar(futuro, parar) or (None, None, 0.0, 0)
+            if self._cancelado(parar): return False
+            item = (caminho, tempo_leitura, tamanho)
+            if erro:
+                return entregar([item], [(erro, None) + ((medidas_vazias(),) if medir else ())])
+            if self.executor is None:
+                return entregar([item], _extrair_conteudos([(caminho, conteudo)], self.tags_template, medir))
+            lote.append((item, conteudo))
+            if len(lote) >= tamanho_lote: return enviar_lote()
+            return True
+
+        def enviar_lote():
+            itens = [item for item, _ in lote]
+            futuro = self.executor.submit(_extrair_conteudos, [(item[0], conteudo) for item, conteudo in lote], self.tags_template, medir)
+            lote.clear()
+            analisando.append((itens, futuro))
+            while len(analisando) > self.workers * 2:
+                if not resolver(): return False
+            return True
+
+        def resolver():
+            itens, futuro = analisando.popleft()
+            resultados = _aguardar(futuro, parar)
+            return resultados is not None and entregar(itens, resultados)
+
+        try:
+            for caminho in arquivos:
+                # Abre espaço antes de ler mais: analisa o mais antigo já lido,
+                # envia o lote incompleto ou espera o lote mais antigo voltar
+                while em_memoria() >= self.leitura_antecipada:
+                    if lidos: continuar = analisar_lido(*lidos.popleft())
+                    elif lote: continuar = enviar_lote()
+                    else: continuar = resolver()
+                    if not continuar: return
+                if self._cancelado(parar): return
+                lidos.append((caminho, leitores.submit(_ler_conteudo, caminho)))
+            while lidos:
+                if not analisar_lido(*lidos.popleft()): return
+            if lote and not enviar_lote(): return
+            while analisando:
+                if not resolver(): return
+        except Exception as e:
+            self._colocar(saida, e, parar)
+        finally:
+            for _, futuro in lidos: futuro.cancel()
+            for _, futuro in analisando: futuro.cancel()
+            self._colocar(saida, self._FIM, parar)
+
+    def extrair(self, arquivos):
+        # Gera (caminho, erro, dados) na ordem de 'arquivos'
+        saida = queue.Queue(maxsize=self.leitura_antecipada)
+        parar = threading.Event()
+        leitores = ThreadPoolExecutor(max_workers=self.threads_leitura, thread_name_prefix="leitura")
+        analise = threading.Thread(target=self._analisar, args=(arquivos, saida, parar, leitores), daemon=True)
+        analise.start()
+        try:
+            while True:
+                try:
+                    item = saida.get(timeout=self.INTERVALO_VERIFICACAO)
+                except queue.Empty:
+                    if self._cancelado(parar): return
+                    continue
+                if item is self._FIM: return
+                if isinstance(item, Exception): raise item
+                if self._cancelado(parar): return
+                yield item
+        finally:
+            parar.set()
+            # Sem esperar uma análise em andamento: a thread sai ao terminá-la
+            analise.join(self.INTERVALO_VERIFICACAO)
+            leitores.shutdown(wait=False, cancel_futures=True)
+
+JANELA_CACHE = 256
+
+def extrair_com_cache(arquivos, tags_template, cache, workers=1, cancel_event=None, executor=None, motor=None, log=None):
+    # Mesma interface de extrair_arquivos, mas só extrai o que não está no cache.
+    # Os resultados continuam saindo na ordem original dos arquivos. A entrada é
+    # consumida em janelas, para funcionar também com a busca em andamento; as
+    # escritas no cache são confirmadas depois das consultas e no fim de cada
+    # janela. motor(arquivos), se informado, substitui extrair_arquivos (ex.:
+    # supervisor). Se o cache falhar, o lote segue sem ele, com um aviso em log().
+    executor_proprio = motor is None and executor is None and workers > 1
+    if executor_proprio: executor = ProcessPoolExecutor(max_workers=workers)
+    arquivos = iter(arquivos)
+    avisado = cache.erro is not None
+
+    def salvar():
+        nonlocal avisado
+        cache.salvar()
+        if cache.erro is not None and not avisado:
+            avisado = True
+            if log: log(f"AVISO: cache de resultados indisponível ({cache.erro}); seguindo sem cache.")
+
+    try:
+        while True:
+            janela = list(islice(arquivos, JANELA_CACHE))
+            if not janela: return
+            consultas, faltantes = [], []
+            for caminho in janela:
+                try:
+                    st = os.stat(caminho)
+                except OSError:
+                    st = None
+                resultado = cache.buscar(caminho, st) if st is not None else None
+                if resultado is None: faltantes.append(caminho)
+                consultas.append((caminho, st, resultado))
+            salvar()
+            if not faltantes:
+                extraidos = iter(()) # Janela toda no cache: nada a iniciar
+            elif motor is not None:
+                extraidos = motor(faltantes)
+            else:
+                extraidos = extrair_arquivos(faltantes, tags_template, workers, cancel_event=cancel_event, executor=executor)
+            for caminho, st, resultado in consultas:
+                if cancel_event is not None and cancel_event.is_set(): return
+                if resultado is not None:
+                    yield (caminho,) + resultado
+                    continue
+                resultado = next(extraidos, None)
+                if resultado is None: return
+                _, erro, dados = resultado
+                # Falhas de leitura podem ser passageiras e não vão para o cache
+                if st is not None and erro in (None, ERRO_ARQUIVO_INVALIDO):
+                    cache.guardar(caminho, st, erro, dados)
+                yield caminho, erro, dados
+            salvar()
+    finally:
+        salvar()
+        if executor_proprio: executor.shutdown(wait=False, cancel_futures=True)
+
+# --- ARQUIVOS REPETIDOS ---
+JANELA_DEDUP = 256
+
+class Deduplicador:
+    # Reconhece arquivos com o mesmo conteúdo em qualquer pasta do lote. Os
+    # arquivos são agrupados pelo tamanho e o hash só é calculado quando dois
+    # têm o mesmo tamanho. O primeiro de cada conteúdo é o original; os demais
+    # (inclusive o mesmo caminho visto de novo) apontam para ele.
+    # compartilhar: guarda o resultado dos originais que já têm hash (os de
+    # tamanho repetido) para entregá-lo às cópias, em qualquer pasta do lote.
+    def __init__(self, compartilhar=False):
+        self.compartilhar = compartilhar
+        self._por_tamanho = {} # tamanho -> primeiro caminho, enquanto ainda não precisou de hash
+        self._por_hash = {} # (tamanho, hash) -> caminho original
+        self._com_hash = set() # Originais registrados em _por_hash
+        self.resultados = {} # original -> (erro, dados), só com compartilhar
+        self.originais = {} # cópia -> original
+        self.copia_de = None # Original do último item entregue por extrair_sem_duplicatas
+        self.bytes_ignorados = self.bytes_hash = 0
+
+    def _registrar_hash(self, caminho, tamanho):
+        self.bytes_hash += tamanho
+        return (tamanho, hash_arquivo(caminho))
+
+    def _novo_original(self, chave, caminho):
+        self._por_hash[chave] = caminho
+        self._com_hash.add(caminho)
+
+    def guardar(self, caminho, erro, dados):
+        # Resultado de um original; só fica em memória se ele já tem cópia possível
+        if self.compartilhar and caminho in self._com_hash: self.resultados[caminho] = (erro, dados)
+
+    def reler(self, caminho):
+        # A cópia precisa ser extraída: o original saiu antes de ter hash e
+        # seu resultado não foi guardado
+        del self.originais[caminho]
+        try:
+            self.bytes_ignorados -= os.path.getsize(caminho)
+        except OSError:
+            pass
+
+    def original(self, caminho):
+        # Caminho do original se 'caminho' for cópia de um arquivo já visto, senão None
+        try:
+            tamanho = os.path.getsize(caminho)
+            if tamanho not in self._por_tamanho:
+                self._por_tamanho[tamanho] = caminho
+                return None
+            primeiro = self._por_tamanho[tamanho]
+            if primeiro is not None:
+                self._por_tamanho[tamanho] = None
+                try:
+                    chave_primeiro = self._registrar_hash(primeiro, tamanho)
+                    if chave_primeiro not in self._por_hash: self._novo_original(chave_primeiro, primeiro)
+                except OSError:
+                    pass
+            chave = self._registrar_hash(caminho, tamanho)
+        except OSError:
+            return None # A extração informa o erro de leitura
+        if chave not in self._por_hash:
+            self._novo_original(chave, caminho)
+            return None
+        original = self._por_hash[chave]
+        self.originais[caminho] = original
+        self.bytes_ignorados += tamanho
+        return original
+
+def extrair_sem_duplicatas(arquivos, extrair, deduplicador, cancel_event=None):
+    # Gera (caminho, erro, dados) na ordem original, passando a extrair() só um
+    # arquivo de cada conteúdo. Com deduplicador.compartilhar as cópias recebem
+    # o resultado do original; senão saem como (caminho, None, None).
+    # A cada item, deduplicador.copia_de diz de qual original ele é cópia.
+    arquivos = iter(arquivos)
+    while True:
+        janela = list(islice(arquivos, JANELA_DEDUP))
+        if not janela: return
+        originais = [deduplicador.original(caminho) for caminho in janela]
+        na_janela = {caminho for caminho, original in zip(janela, originais) if original is None}
+        if deduplicador.compartilhar:
+            # Originais de janelas anteriores sem resultado guardado: a cópia é extraída
+            for caminho, original in zip(janela, originais):
+                if (original is not None and original != caminho and original not in na_janela
+                        and original not in deduplicador.resultados):
+                    deduplicador.reler(caminho)
+        extrair_agora = [caminho for caminho, original in zip(janela, originais) if original is None or caminho not in deduplicador.originais]
+        extraidos = extrair(extrair_agora) if extrair_agora else iter(())
+        for caminho, original in zip(janela, originais):
+            if cancel_event is not None and cancel_event.is_set(): return
+            deduplicador.copia_de = original
+            if original is None or caminho not in deduplicador.originais:
+                resultado = next(extraidos, None)
+                if resultado is None: return
+                if original is None: deduplicador.guardar(*resultado)
+                yield resultado
+            else:
+                yield (caminho,) + deduplicador.resultados.get(original, (None, None))
+
+# --- EXTRAÇÃO SUPERVISIONADA ---
+LIMIAR_LENTO = 1.0 # segundos; arquivos acima disso aparecem no resumo do lote
+
+def _trabalhador_supervisionado(conexao, tags_template, medir=False):
+    extrair = extrair_dados_lis_medido if medir else extrair_dados_lis
+    while True:
+        caminho = conexao.recv()
+        if caminho is None: return
+        conexao.send(extrair(caminho, tags_template))
+
+class _Trabalhador:
+    # Um processo de extração dedicado, que pode ser encerrado no meio de um arquivo
+    def __init__(self, tags_template, medir=False):
+        self.tags_template = tags_template
+        self.medir = medir
+        self.tarefa = None # (indice, caminho, inicio)
+        self._iniciar()
+
+    def _iniciar(self):
+        self.conexao, filho = multiprocessing.Pipe()
+        self.processo = multiprocessing.Process(target=_trabalhador_supervisionado, args=(filho, self.tags_template, self.medir), daemon=True)
+        self.processo.start()
+        filho.close()
+
+    def enviar(self, indice, caminho):
+        self.tarefa = (indice, caminho, time.monotonic())
+        self.conexao.send(caminho)
+
+    def reiniciar(self):
+        self.encerrar(forcar=True)
+        self._iniciar()
+
+    def encerrar(self, forcar=False):
+        self.tarefa = None
+        if not forcar and self.processo.is_alive():
+            try:
+                self.conexao.send(None)
+                self.processo.join(timeout=1)
+            except OSError:
+                pass
+        if self.processo.is_alive():
+            self.processo.terminate()
+            self.processo.join()
+        self.conexao.close()
+
+class SupervisorExtracao:
+    # Extrai cada arquivo num processo próprio e vigiado: arquivos acima do
+    # tamanho máximo nem são abertos, e o processo que passa do tempo limite
+    # (arquivo corrompido, compartilhamento de rede travado...) é encerrado e
+    # substituído sem parar o lote. O cancelamento também encerra os processos,
+    # então vale em no máximo INTERVALO_VERIFICACAO mesmo no meio de um arquivo.
+    INTERVALO_VERIFICACAO = 0.1
+    MAX_LENTOS = 20
+
+    def __init__(self, tags_template, workers=1, tempo_limite=None, tamanho_maximo=None, medidor=None):
+        self.tags_template = list(tags_template)
+        self.tempo_limite = tempo_limite
+        self.tamanho_maximo = tamanho_maximo # em bytes
+        self.medidor = medidor
+        self.trabalhadores = [_Trabalhador(self.tags_template, medidor is not None) for _ in range(max(1, workers))]
+        self._lentos = [] # heap com os MAX_LENTOS arquivos mais demorados
+
+    def lentos(self, minimo=0.0):
+        # [(caminho, segundos)] dos arquivos mais demorados, do mais lento ao mais rápido
+        return [(caminho, duracao) for duracao, caminho in sorted(self._lentos, reverse=True) if duracao >= minimo]
+
+    def _registrar_duracao(self, caminho, duracao):
+        if len(self._lentos) < self.MAX_LENTOS:
+            heapq.heappush(self._lentos, (duracao, caminho))
+        elif duracao > self._lentos[0][0]:
+            heapq.heapreplace(self._lentos, (duracao, caminho))
+
+    def _verificar_tamanho(self, caminho):
+        if not self.tamanho_maximo: return None
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return None # O próprio trabalhador informa o erro de leitura
+        if tamanho > self.tamanho_maximo:
+            return f"Arquivo muito grande ({tamanho / 2**20:.1f} MB, limite {self.tamanho_maximo / 2**20:g} MB)"
+        return None
+
+    def extrair(self, arquivos, cancel_event=None):
+        # Gera (caminho, erro, dados) na ordem original dos arquivos
+        cancelado = lambda: cancel_event is not None and cancel_event.is_set()
+        arquivos = iter(arquivos)
+        prontos = {}
+        enviados = proximo = 0
+        esgotado = False
+        limite_adiantados = len(self.trabalhadores) * 4
+        try:
+            while True:
+                if cancelado(): return
+                for trabalhador in self.trabalhadores:
+                    while trabalhador.tarefa is None and not esgotado and enviados - proximo < limite_adiantados:
+                        caminho = next(arquivos, None)
+                        if caminho is None:
+                            esgotado = True
+                            break
+                        indice, enviados = enviados, enviados + 1
+                        erro = self._verificar_tamanho(caminho)
+                        if erro:
+                            prontos[indice] = (caminho, erro, None)
+                            if self.medidor: self.medidor.registrar_interrupcao(caminho, 0.0, 'too_large')
+                        else:
+                            trabalhador.enviar(indice, caminho)
+                while proximo in prontos:
+                    yield prontos.pop(proximo)
+                    proximo += 1
+                    if cancelado(): return
+                ocupados = [t for t in self.trabalhadores if t.tarefa is not None]
+                if not ocupados:
+                    if esgotado and proximo == enviados: return
+                    continue
+                com_resposta = aguardar_conexoes([t.conexao for t in ocupados], timeout=self.INTERVALO_VERIFICACAO)
+                agora = time.monotonic()
+                for trabalhador in ocupados:
+                    indice, caminho, inicio = trabalhador.tarefa
+                    motivo = None # Sem resposta do processo: o medidor recebe só a duração
+                    if trabalhador.conexao in com_resposta:
+                        try:
+                            _, erro, dados = _repassar(caminho, trabalhador.conexao.recv(), self.medidor)
+                            trabalhador.tarefa = None
+                        except (EOFError, OSError):
+                            erro, dados, motivo = "Falha no processo de extração", None, 'crash'
+                            trabalhador.reiniciar()
+                    elif not trabalhador.processo.is_alive():
+                        erro, dados, motivo = f"Falha no processo de extração (código {trabalhador.processo.exitcode})", None, 'crash'
+                        trabalhador.reiniciar()
+                    elif self.tempo_limite and agora - inicio > self.tempo_limite:
+                        erro, dados, motivo = f"Tempo limite esgotado ({self.tempo_limite:g} s)", None, 'timeout'
+                        trabalhador.reiniciar()
+                    else:
+                        continue
+                    if motivo and self.medidor: self.medidor.registrar_interrupcao(caminho, agora - inicio, motivo)
+                    self._registrar_duracao(caminho, agora - inicio)
+                    prontos[indice] = (caminho, erro, dados)
+        finally:
+            # Um arquivo interrompido deixaria o processo num estado desconhecido
+            for trabalhador in self.trabalhadores:
+                if trabalhador.tarefa is not None: trabalhador.reiniciar()
+
+    def fechar(self, forcar=False):
+        for trabalhador in self.trabalhadores: trabalhador.encerrar(forcar)
+
+# --- BUSCA DE ARQUIVOS ---
+def normalizar_extensoes(extensoes):
+    # Aceita "lis, .txt" ou uma lista; garante minúsculas e o '.' inicial
+    if isinstance(extensoes, str): extensoes = extensoes.split(',')
+    return [f".{ext.strip().lower().lstrip('.')}" for ext in extensoes if ext.strip()]
+
+def _compilar_globs(padroes):
+    padroes = [p.strip() for p in padroes if p.strip()]
+    if not padroes: return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in padroes), re.IGNORECASE)
+
+class DescobertaArquivos:
+    # Percorre as pastas com os.scandir numa thread própria e entrega pares
+    # (pasta_raiz, caminho) à medida que os encontra, para a extração começar
+    # antes de a árvore inteira ser listada. 'total' cresce até 'concluida'.
+    # Os padrões glob de incluir/excluir valem para o nome e para o caminho
+    # relativo à pasta raiz (com '/'); uma subpasta excluída não é visitada.
+    _FIM = object()
+
+    def __init__(self, pastas, extensoes, recursivo=False, incluir=(), excluir=(), cancel_event=None):
+        self.pastas = list(pastas)
+        self.sufixos = tuple(normalizar_extensoes(extensoes))
+        self.recursivo = recursivo
+        self.incluir = _compilar_globs(incluir)
+        self.excluir = _compilar_globs(excluir)
+        self.cancel_event = cancel_event
+        self.total = 0
+        self.concluida = False
+        self.erros = []
+        self.duracoes = [] # Segundos gastos em cada pasta listada
+        self._parar = threading.Event()
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._percorrer, daemon=True)
+        self._thread.start()
+
+    def _interrompida(self):
+        return self._parar.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+    def _percorrer(self):
+        try:
+            for pasta in self.pastas:
+                pilha = [(pasta, '')]
+                while pilha and not self._interrompida():
+                    diretorio, relativo = pilha.pop()
+                    subpastas = []
+                    inicio = time.perf_counter()
+                    try:
+                        with os.scandir(diretorio) as entradas:
+                            for entrada in entradas:
+                                nome = entrada.name
+                                caminho_relativo = f"{relativo}/{nome}" if relativo else nome
+                                if self.excluir and (self.excluir.match(nome) or self.excluir.match(caminho_relativo)): continue
+                                try:
+                                    if entrada.is_file():
+                                        if not nome.lower().endswith(self.sufixos): continue
+                                        if self.incluir and not (self.incluir.match(nome) or self.incluir.match(caminho_relativo)): continue
+                                        self.total += 1
+                                        self._fila.put((pasta, entrada.path))
+                                    elif self.recursivo and entrada.is_dir(follow_symlinks=False):
+                                        subpastas.append((entrada.path, caminho_relativo))
+                                except OSError:
+                                    continue
+                    except OSError as e:
+                        self.erros.append(f"{diretorio}: {e}")
+                    self.duracoes.append(time.perf_counter() - inicio)
+                    # Mantém a ordem do scandir ao visitar as subpastas
+                    pilha.extend(reversed(subpastas))
+        finally:
+            self.concluida = True
+            self._fila.put(self._FIM)
+
+    def __iter__(self):
+        while True:
+            item = self._fila.get()
+            if item is self._FIM: return
+            yield item
+
+    def parar(self):
+        self._parar.set()
+
+def encontrar_arquivos(pastas, extensoes, recursivo=False, incluir=(), excluir=()):
+    return [caminho for _, caminho in DescobertaArquivos(pastas, extensoes, recursivo, incluir, excluir)]
+
+# --- GRAVAÇÃO DA SAÍDA ---
+def cabecalho_saida(tags_template=("BEGIN WRITE @WRITEMAXMIN #",)):
+    # As colunas de valores vêm das posições realmente geradas pelos templates
+    return ["Caminho do Arquivo", "Nome do Arquivo"] + compilar_tags(tuple(tags_template)).colunas
+
+class GravadorSaida:
+    # Grava cada linha assim que ela fica pronta: .xlsx no modo write_only do
+    # openpyxl ou .csv incremental. A memória não cresce com o número de linhas.
+    # anexar: um .csv que já existe recebe as novas linhas no fim, sem repetir
+    # o cabeçalho (o .xlsx é sempre recriado).
+    # .npz/.parquet guardam as linhas numa TabelaResultados (numpy) e gravam
+    # tudo ao fechar; colunas_texto são as posições que não são números.
+    INTERVALO_FLUSH = 1000
+    FORMATOS = ('.xlsx', '.csv', '.npz', '.parquet')
+
+    def __init__(self, path, header=None, anexar=False, colunas_texto=()):
+        self.path = path
+        self.linhas = 0
+        self._workbook = self._arquivo = self._tabela = None
+        if path.endswith(('.npz', '.parquet')):
+            from tabela import TabelaResultados
+            self._tabela = TabelaResultados((header or cabecalho_saida())[2:], colunas_texto)
+            self._escrever = lambda row: self._tabela.adicionar(row[0], row[2:])
+            return
+        if path.endswith('.xlsx'):
+            import openpyxl
+            self._workbook = openpyxl.Workbook(write_only=True)
+            self._escrever = self._workbook.create_sheet().append
+        elif path.endswith('.csv'):
+            anexar = anexar and os.path.exists(path) and os.path.getsize(path) > 0
+            self._arquivo = open(path, 'a' if anexar else 'w', newline='', encoding='utf-8')
+            self._escrever = csv.writer(self._arquivo).writerow
+            if anexar: return
+        else:
+            raise ValueError(f"formato de saída não suportado: {os.path.basename(path)}")
+        self._escrever(header or cabecalho_saida())
+
+    def escrever(self, row):
+        self._escrever(row)
+        self.linhas += 1
+        # No .csv, as linhas já gravadas ficam no disco mesmo se o lote for interrompido
+        if self._arquivo is not None and self.linhas % self.INTERVALO_FLUSH == 0:
+            self._arquivo.flush()
+
+    def fechar(self):
+        if self._tabela is not None:
+            tabela, self._tabela = self._tabela, None
+            tabela.salvar(self.path)
+        if self._workbook is not None:
+            workbook, self._workbook = self._workbook, None
+            workbook.save(self.path)
+        if self._arquivo is not None:
+            arquivo, self._arquivo = self._arquivo, None
+            arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def base_relatorio(saida, modo='single'):
+    # Relatórios de desempenho ficam ao lado da saída, sem extensão
+    if modo == 'multiple': return os.path.join(saida, 'perfil_extracao')
+    return os.path.splitext(saida)[0] + '_perfil'
+
+def salvar_dados(data, path, header=None, colunas_texto=()):
+    # Lança a exceção original em caso de falha; quem chama decide como avisar
+    with GravadorSaida(path, header, colunas_texto=colunas_texto) as gravador:
+        for row in data: gravador.escrever(row)
+
+# --- PROCESSAMENTO EM LOTE ---
+def _sem_log(message): pass
+
+def nivel_mensagem(message):
+    # Nível de logging das mensagens de processar_lote, pelo prefixo usado nelas
+    if message.startswith("ERRO"): return logging.ERROR
+    if message.startswith("AVISO"): return logging.WARNING
+    return logging.INFO
+
+def processar_lote(pastas, tags_template, extensoes, saida, modo='single', workers=1, cancel_event=None, log=_sem_log, progresso=None,
+                   cache=None, cache_max_entradas=None, recursivo=False, incluir=(), excluir=(), tempo_limite=None, tamanho_maximo=None,
+                   medir=False, perfil=False, deduplicar=None, leitura_antecipada=0, threads_leitura=4, cache_verificar_conteudo=False):
+    # Executa um lote completo, sem depender da interface gráfica.
+    # modo 'single': 'saida' é o arquivo .xlsx/.csv consolidado.
+    # modo 'multiple': 'saida' é a pasta onde vai um .xlsx por pasta de entrada.
+    # progresso(atual, total) é chamado a cada arquivo lido.
+    # cache: caminho do banco SQLite de resultados (None desativa o cache).
+    # cache_verificar_conteudo: aproveita também entradas de arquivos só com a
+    # data de modificação alterada, se o conteúdo tiver o mesmo hash.
+    # tempo_limite (s) e tamanho_maximo (bytes) ligam a extração supervisionada:
+    # o arquivo que passa de um deles vira erro e o lote continua.
+    # medir: tempos por etapa e por arquivo, resumidos no log e exportados em
+    # JSON/CSV ao lado da saída. perfil: grava um cProfile (.prof) do lote; com
+    # mais de um processo, a extração em si não aparece nele.
+    # deduplicar: arquivos com o mesmo conteúdo são lidos uma vez só; 'unico'
+    # grava uma linha por conteúdo e 'todos' grava cada cópia com o resultado
+    # do original.
+    # leitura_antecipada: quantos arquivos são lidos à frente da análise, por
+    # threads_leitura threads (PipelineExtracao); 0 mantém a leitura dentro da
+    # análise. Não se aplica à extração supervisionada.
+    # A busca de arquivos roda uma única vez, em paralelo com a extração; o total
+    # passado a progresso() cresce até a busca terminar.
+    # Tags inválidas geram ValueError aqui, antes de qualquer arquivo ser lido.
+    header = cabecalho_saida(tags_template)
+    casador = compilar_tags(tuple(tags_template))
+    perfil_cpu = cProfile.Profile() if perfil else None
+    if perfil_cpu: perfil_cpu.enable()
+    inicio = time.perf_counter()
+    resumo = {'files': 0, 'rows': 0, 'errors': 0, 'outputs': [], 'save_errors': [], 'cancelled': False}
+    medidor = MedidorEtapas() if medir else None
+    deduplicador = Deduplicador(compartilhar=deduplicar == 'todos') if deduplicar else None
+    cancelado = lambda: cancel_event is not None and cancel_event.is_set()
+    descoberta = DescobertaArquivos(pastas, extensoes, recursivo, incluir, excluir, cancel_event=cancel_event)
+    if modo == 'multiple':
+        grupos = groupby(descoberta, key=lambda item: item[0])
+    else:
+        grupos = groupby(descoberta, key=lambda item: None)
+
+    if modo == 'multiple':
+        log(f"Modo de lote: Um arquivo por pasta. Salvando em: {saida}")
+        log(f"Processos em paralelo: {workers}")
+    else:
+        log(f"Iniciando o processamento (modo de arquivo único, {workers} processo(s))...")
+    executor = supervisor = None
+    if tempo_limite or tamanho_maximo:
+        supervisor = SupervisorExtracao(tags_template, workers, tempo_limite, tamanho_maximo, medidor)
+        motor = lambda arquivos: supervisor.extrair(arquivos, cancel_event)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        if leitura_antecipada:
+            pipeline = PipelineExtracao(tags_template, workers, leitura_antecipada, threads_leitura, cancel_event, executor, medidor)
+            motor = pipeline.extrair
+        else:
+            motor = lambda arquivos: extrair_arquivos(arquivos, tags_template, workers, cancel_event=cancel_event, executor=executor, medidor=medidor)
+    cache_extracao = None
+    if cache:
+        opcoes = {'max_entradas': cache_max_entradas} if cache_max_entradas else {}
+        try:
+            cache_extracao = CacheExtracao(cache, tags_template, verificar_conteudo=cache_verificar_conteudo, **opcoes)
+        except Exception as e:
+            log(f"AVISO: cache de resultados indisponível ({e}).")
+    try:
+        for folder_path, itens in grupos:
+            if cancelado(): break
+            folder_files = (caminho for _, caminho in itens)
+            if folder_path is not None:
+                log(f"--- Processando pasta: {os.path.basename(folder_path)} ---")
+            if folder_path is not None:
+                output_path = os.path.join(saida, f"dados_extraidos_{os.path.basename(folder_path)}.xlsx")
+            else:
+                output_path = saida
+            # A saída só é criada na primeira linha válida e recebe cada linha na hora
+            gravador, falha_gravacao = None, False
+            if cache_extracao is not None:
+                extrair = lambda arquivos: extrair_com_cache(arquivos, tags_template, cache_extracao, cancel_event=cancel_event, motor=motor, log=log)
+            else:
+                extrair = motor
+            if deduplicador is not None:
+                resultados = extrair_sem_duplicatas(folder_files, extrair, deduplicador, cancel_event)
+            else:
+                resultados = extrair(folder_files)
+            # Se uma exceção escapar do laço, o que já foi gravado ainda é fechado e salvo
+            try:
+                for file_path, erro, dados in resultados:
+                    total_txt = f"{descoberta.total}" if descoberta.concluida else f"{descoberta.total}+"
+                    log(f"Lendo ({resumo['files']+1}/{total_txt}): {os.path.basename(file_path)}")
+                    escrita = None
+                    original = deduplicador.copia_de if deduplicador is not None else None
+                    if original is not None:
+                        log(f"Cópia de {original}" + ("." if deduplicar == 'todos' and original != file_path else ", ignorada."))
+                        # O mesmo caminho listado duas vezes nunca gera duas linhas
+                        if deduplicar != 'todos' or original == file_path: dados = None
+                    if erro:
+                        log(f"AVISO: {os.path.basename(file_path)} - {erro}.")
+                        resumo['errors'] += 1
+                    elif dados and not falha_gravacao:
+                        try:
+                            inicio_escrita = time.perf_counter()
+                            if gravador is None: gravador = GravadorSaida(output_path, header, colunas_texto=casador.colunas_texto)
+                            gravador.escrever([file_path, os.path.basename(file_path)] + dados)
+                            escrita = time.perf_counter() - inicio_escrita
+                        except Exception as e:
+                            log(f"ERRO ao salvar o arquivo {output_path}: {e}")
+                            resumo['save_errors'].append((output_path, str(e)))
+                            falha_gravacao = True
+                    if medidor: medidor.concluir_arquivo(file_path, escrita, erro, copia=original is not None)
+                    resumo['files'] += 1
+                    if progresso: progresso(resumo['files'], descoberta.total)
+            finally:
+                if gravador is not None:
+                    try:
+                        inicio_escrita = time.perf_counter()
+                        gravador.fechar()
+                        if medidor: medidor.registrar('save', time.perf_counter() - inicio_escrita)
+                        if not falha_gravacao:
+                            log(f"Arquivo salvo com sucesso em: {output_path}")
+                            resumo['outputs'].append(output_path)
+                            resumo['rows'] += gravador.linhas
+                    except Exception as e:
+                        if not falha_gravacao:
+                            log(f"ERRO ao salvar o arquivo {output_path}: {e}")
+                            resumo['save_errors'].append((output_path, str(e)))
+    finally:
+        descoberta.parar()
+        if executor: executor.shutdown(wait=False, cancel_futures=True)
+        if supervisor: supervisor.fechar(forcar=cancelado())
+        if cache_extracao is not None:
+            resumo['cache_hits'], resumo['cache_misses'] = cache_extracao.hits, cache_extracao.misses
+            cache_extracao.fechar()
+            log(f"Cache de resultados: {cache_extracao.hits} reaproveitado(s), {cache_extracao.misses} extraído(s).")
+    for erro in descoberta.erros: log(f"AVISO: não foi possível listar {erro}.")
+    if deduplicador is not None:
+        resumo['duplicates'] = resumo['skipped_parses'] = len(deduplicador.originais)
+        resumo['skipped_bytes'] = deduplicador.bytes_ignorados
+        resumo['hashed_bytes'] = deduplicador.bytes_hash
+        log(f"Arquivos repetidos: {len(deduplicador.originais)} não lido(s), {deduplicador.bytes_ignorados / 2**20:.1f} MB poupados "
+            f"({deduplicador.bytes_hash / 2**20:.1f} MB lidos para comparar conteúdos).")
+    if supervisor:
+        resumo['slow_files'] = [{'path': caminho, 'seconds': round(duracao, 3)} for caminho, duracao in supervisor.lentos(LIMIAR_LENTO)]
+        for item in resumo['slow_files']:
+            log(f"Arquivo lento: {os.path.basename(item['path'])} ({item['seconds']:.1f} s)")
+    resumo['total'] = descoberta.total
+    if descoberta.total == 0:
+        log("Nenhum arquivo com as extensões especificadas foi encontrado.")
+    resumo['cancelled'] = cancelado()
+    resumo['elapsed_s'] = round(time.perf_counter() - inicio, 3)
+    resumo['reports'] = []
+    if perfil_cpu: perfil_cpu.disable()
+    if medidor or perfil_cpu:
+        base = base_relatorio(saida, modo)
+        try:
+            if medidor:
+                for duracao in descoberta.duracoes: medidor.registrar('discover', duracao)
+                for linha in medidor.linhas_resumo(): log(linha)
+                resumo['timings'] = medidor.resumo()
+                resumo['reports'] += medidor.exportar(base)
+            if perfil_cpu:
+                perfil_cpu.dump_stats(base + '.prof')
+                resumo['reports'].append(base + '.prof')
+            log(f"Relatórios de desempenho salvos em: {', '.join(resumo['reports'])}")
+        except OSError as e:
+            log(f"AVISO: não foi possível salvar os relatórios de desempenho ({e}).")
+    return resumo
@@ -0,0 +1,568 @@
+import os
+import queue
+import shutil
+import threading
+import configparser
+import logging
+import tkinter as tk
+from tkinter import simpledialog, filedialog, messagebox, scrolledtext
+from tkinter.ttk import Progressbar
+from tkinterdnd2 import DND_FILES, TkinterDnD
+
+from extrator import compilar_tags, nivel_mensagem, normalizar_extensoes, processar_lote
+from observador import ObservadorPastas
+
+# --- JANELA DE OPÇÃO DE MODO LOTE ---
+class BatchOptionDialog(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Opção de Processamento em Lote")
+        self.geometry("350x150")
+        self.transient(parent)
+        self.grab_set()
+        self.result = None
+        tk.Label(self, text="Você selecionou múltiplas pastas.\nComo deseja salvar os arquivos de saída?", justify='center').pack(pady=15)
+        btn_frame = tk.Frame(self)
+        btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="Um Único Arquivo", command=lambda: self.set_result('single')).pack(side='left', padx=10)
+        tk.Button(btn_frame, text="Um Arquivo por Pasta", command=lambda: self.set_result('multiple')).pack(side='left', padx=10)
+        tk.Button(self, text="Cancelar", command=self.destroy).pack(pady=5)
+        self.wait_window(self)
+    def set_result(self, result):
+        self.result = result
+        self.destroy()
+
+# --- JANELA DE CONFIGURAÇÃO DE TAGS ---
+class TagConfigWindow(tk.Toplevel):
+    def __init__(self, parent, tags):
+        super().__init__(parent)
+        self.title("Configurar Tags de Busca")
+        self.geometry("500x400")
+        self.transient(parent)
+        self.grab_set()
+        self.tags = list(tags)
+        self.parent = parent
+        tk.Label(self, text="Tags para extração (use # como curinga para o número).\nOpções após '|': campos=1,2 | casas=completo | modo=arredondar | faixa=1-120 | nome=Max", justify='center').pack(pady=5)
+        list_frame = tk.Frame(self)
+        list_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        self.listbox = tk.Listbox(list_frame)
+        self.listbox.pack(side='left', fill='both', expand=True)
+        scrollbar = tk.Scrollbar(list_frame, orient='vertical', command=self.listbox.yview)
+        scrollbar.pack(side='right', fill='y')
+        self.listbox.config(yscrollcommand=scrollbar.set)
+        for tag in self.tags: self.listbox.insert(tk.END, tag)
+        btn_frame = tk.Frame(self)
+        btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="Adicionar", command=self.add_tag).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Remover", command=self.remove_tag).pack(side='left', padx=5)
+        tk.Button(self, text="Salvar e Fechar", command=self.save_and_close).pack(pady=10)
+    def add_tag(self):
+        new_tag = simpledialog.askstring("Adicionar Tag", "Digite a nova tag:", parent=self)
+        if new_tag and new_tag not in self.tags:
+            try:
+                compilar_tags((new_tag,))
+            except ValueError as e:
+                messagebox.showerror("Tag Inválida", str(e), parent=self)
+                return
+            self.tags.append(new_tag)
+            self.listbox.insert(tk.END, new_tag)
+    def remove_tag(self):
+        selected_indices = self.listbox.curselection()
+        if not selected_indices: return
+        self.tags.remove(self.listbox.get(selected_indices[0]))
+        self.listbox.delete(selected_indices[0])
+    def save_and_close(self):
+        self.parent.update_tags(self.tags)
+        self.destroy()
+
+# --- APLICAÇÃO GRÁFICA ---
+class App:
+    CONFIG_FILE = 'config.ini'
+    CACHE_FILE = 'extrator_cache.sqlite'
+    DEDUP_OPTIONS = {"Ler todos": '', "Uma linha por conteúdo": 'unico', "Todas as cópias (lidas uma vez)": 'todos'}
+    STATUS_INTERVAL_MS = 100 # Intervalo de atualização do log e da barra de progresso
+    LOG_MAX_LINES = 2000 # Linhas mantidas na tela; o extrator.log recebe tudo
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Extrator de Dados v1.00.00")
+        self.root.geometry("700x720") # Aumentei a altura para os novos campos
+        self.processing_thread = None
+        self.cancel_event = threading.Event()
+
+        self.file_extensions_var = tk.StringVar() # Variável para os tipos de arquivo
+        self.workers_var = tk.IntVar(value=os.cpu_count() or 1) # Processos de extração em paralelo
+        self.use_cache_var = tk.BooleanVar(value=True) # Reaproveita resultados de arquivos não alterados
+        self.cache_max_entries = None
+        self.cache_verify_var = tk.BooleanVar(value=False) # Compara o conteúdo de arquivos com data alterada
+        self.recursive_var = tk.BooleanVar(value=False) # Busca também nas subpastas
+        self.include_var = tk.StringVar() # Padrões glob, separados por vírgula
+        self.exclude_var = tk.StringVar()
+        self.timeout_var = tk.StringVar() # Segundos por arquivo; vazio = sem limite
+        self.max_size_var = tk.StringVar() # MB por arquivo; vazio = sem limite
+        self.dedup_var = tk.StringVar(value="Ler todos") # Tratamento de arquivos com o mesmo conteúdo
+        self.read_ahead_var = tk.IntVar(value=0) # Arquivos lidos à frente da análise (0 = desligado)
+        self.read_threads = 4
+        self.quiet_var = tk.BooleanVar(value=False) # Mostra na tela só avisos e erros
+        self.timings_var = tk.BooleanVar(value=False) # Relatório de tempos por etapa ao lado da saída
+        self.profile_var = tk.BooleanVar(value=False) # Perfil cProfile do lote
+        self.status_queue = queue.Queue() # Mensagens da thread de processamento para a tela
+        self.pending_progress = None
+
+        self.create_menu()
+        self.create_widgets()
+        self.load_config()
+        self.root.drop_target_register(DND_FILES)
+        self.root.dnd_bind('<<Drop>>', self.handle_drop)
+        self.root.after(self.STATUS_INTERVAL_MS, self.drain_status)
+
+    def create_menu(self):
+        menubar = tk.Menu(self.root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Observar Pastas...", command=self.start_watch)
+        file_menu.add_command(label="Estatísticas de Resultados...", command=self.show_statistics)
+        file_menu.add_command(label="Salvar Log Como...", command=self.save_log_file)
+        file_menu.add_separator()
+        file_menu.add_command(label="Sair", command=self.on_closing)
+        menubar.add_cascade(label="Arquivo", menu=file_menu)
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        edit_menu.add_command(label="Configurar Tags...", command=self.open_tag_config)
+        edit_menu.add_checkbutton(label="Log Resumido (só avisos e erros)", variable=self.quiet_var)
+        edit_menu.add_checkbutton(label="Cache: Comparar Conteúdo de Arquivos com Data Alterada", variable=self.cache_verify_var)
+        edit_menu.add_separator()
+        edit_menu.add_checkbutton(label="Medir Tempos por Etapa", variable=self.timings_var)
+        edit_menu.add_checkbutton(label="Capturar Perfil (cProfile)", variable=self.profile_var)
+        menubar.add_cascade(label="Editar", menu=edit_menu)
+        help_menu = tk.Menu(menubar, tearoff=0)
+        help_menu.add_command(label="Instruções", command=self.show_instructions)
+        help_menu.add_command(label="Sobre...", command=self.show_about)
+        menubar.add_cascade(label="Ajuda", menu=help_menu)
+        self.root.config(menu=menubar)
+
+    def create_widgets(self):
+        top_frame = tk.Frame(self.root, padx=10, pady=10)
+        top_frame.pack(fill='x')
+        tk.Label(top_frame, text="Arraste e solte as pastas com os arquivos aqui:").pack(anchor='w')
+        
+        folder_list_frame = tk.Frame(self.root, padx=10)
+        folder_list_frame.pack(fill='x')
+        self.folder_listbox = tk.Listbox(folder_list_frame, height=5)
+        self.folder_listbox.pack(side='left', fill='x', expand=True)
+        folder_btn_frame = tk.Frame(folder_list_frame, padx=5)
+        folder_btn_frame.pack(side='left')
+        tk.Button(folder_btn_frame, text="Adicionar Pasta...", command=self.add_folder).pack(pady=2)
+        tk.Button(folder_btn_frame, text="Remover Pasta", command=self.remove_folder).pack(pady=2)
+
+        # --- NOVO CAMPO PARA TIPOS DE ARQUIVO ---
+        ext_frame = tk.Frame(self.root, padx=10, pady=5)
+        ext_frame.pack(fill='x')
+        tk.Label(ext_frame, text="Tipos de Arquivo (separados por vírgula):").pack(side='left', padx=(0, 5))
+        self.ext_entry = tk.Entry(ext_frame, textvariable=self.file_extensions_var)
+        self.ext_entry.pack(fill='x', expand=True)
+
+        filter_frame = tk.Frame(self.root, padx=10, pady=5)
+        filter_frame.pack(fill='x')
+        self.recursive_checkbutton = tk.Checkbutton(filter_frame, text="Incluir subpastas", variable=self.recursive_var)
+        self.recursive_checkbutton.pack(side='left')
+        tk.Label(filter_frame, text="Incluir:").pack(side='left', padx=(10, 5))
+        self.include_entry = tk.Entry(filter_frame, textvariable=self.include_var, width=18)
+        self.include_entry.pack(side='left')
+        tk.Label(filter_frame, text="Excluir:").pack(side='left', padx=(10, 5))
+        self.exclude_entry = tk.Entry(filter_frame, textvariable=self.exclude_var, width=18)
+        self.exclude_entry.pack(side='left')
+
+        workers_frame = tk.Frame(self.root, padx=10, pady=5)
+        workers_frame.pack(fill='x')
+        tk.Label(workers_frame, text="Processos em paralelo:").pack(side='left', padx=(0, 5))
+        self.workers_spinbox = tk.Spinbox(workers_frame, from_=1, to=max(64, os.cpu_count() or 1), width=5, textvariable=self.workers_var)
+        self.workers_spinbox.pack(side='left')
+        self.cache_checkbutton = tk.Checkbutton(workers_frame, text="Reaproveitar resultados de arquivos não alterados (cache)", variable=self.use_cache_var)
+        self.cache_checkbutton.pack(side='left', padx=(15, 0))
+        tk.Label(workers_frame, text="Leitura antecipada:").pack(side='left', padx=(15, 5))
+        self.read_ahead_spinbox = tk.Spinbox(workers_frame, from_=0, to=256, width=5, textvariable=self.read_ahead_var)
+        self.read_ahead_spinbox.pack(side='left')
+
+        limits_frame = tk.Frame(self.root, padx=10, pady=5)
+        limits_frame.pack(fill='x')
+        tk.Label(limits_frame, text="Tempo limite por arquivo (s):").pack(side='left', padx=(0, 5))
+        self.timeout_entry = tk.Entry(limits_frame, textvariable=self.timeout_var, width=8)
+        self.timeout_entry.pack(side='left')
+        tk.Label(limits_frame, text="Tamanho máximo (MB):").pack(side='left', padx=(15, 5))
+        self.max_size_entry = tk.Entry(limits_frame, textvariable=self.max_size_var, width=8)
+        self.max_size_entry.pack(side='left')
+        tk.Label(limits_frame, text="(vazio = sem limite)").pack(side='left', padx=(5, 0))
+
+        dedup_frame = tk.Frame(self.root, padx=10, pady=5)
+        dedup_frame.pack(fill='x')
+        tk.Label(dedup_frame, text="Arquivos repetidos:").pack(side='left', padx=(0, 5))
+        self.dedup_menu = tk.OptionMenu(dedup_frame, self.dedup_var, *self.DEDUP_OPTIONS)
+        self.dedup_menu.pack(side='left')
+
+        self.btn_process = tk.Button(self.root, text="Iniciar Processamento", command=self.start_or_cancel_processing, state='disabled')
+        self.btn_process.pack(pady=10)
+        
+        log_frame = tk.Frame(self.root, padx=10, pady=5)
+        log_frame.pack(fill='both', expand=True)
+        self.log_text = scrolledtext.ScrolledText(log_frame, state='disabled', height=10)
+        self.log_text.pack(fill='both', expand=True)
+        
+        self.progress = Progressbar(self.root, orient='horizontal', mode='determinate')
+        self.progress.pack(fill='x', padx=10, pady=5)
+        
+        bottom_frame = tk.Frame(self.root, padx=10, pady=10)
+        bottom_frame.pack(fill='x')
+        self.btn_restart = tk.Button(bottom_frame, text="Limpar e Reiniciar", command=self.restart_process)
+        self.btn_restart.pack(side='left', expand=True, fill='x', padx=5)
+        self.btn_close = tk.Button(bottom_frame, text="Fechar", command=self.on_closing)
+        self.btn_close.pack(side='left', expand=True, fill='x', padx=5)
+
+    def log(self, message):
+        # Pode ser chamado de qualquer thread: grava no disco na hora e deixa a
+        # tela para drain_status, que atualiza tudo de uma vez a cada intervalo
+        nivel = nivel_mensagem(message)
+        logging.log(nivel, message)
+        self.status_queue.put((nivel, message))
+
+    def drain_status(self):
+        min_level = logging.WARNING if self.quiet_var.get() else logging.INFO
+        messages = []
+        while True:
+            try:
+                nivel, message = self.status_queue.get_nowait()
+            except queue.Empty:
+                break
+            if nivel >= min_level: messages.append(message)
+        if messages:
+            self.log_text.config(state='normal')
+            self.log_text.insert(tk.END, '\n'.join(messages[-self.LOG_MAX_LINES:]) + '\n')
+            self.log_text.delete('1.0', f'end-{self.LOG_MAX_LINES + 1}l')
+            self.log_text.config(state='disabled')
+            self.log_text.see(tk.END)
+        if self.pending_progress is not None:
+            atual, total = self.pending_progress
+            self.pending_progress = None
+            self.progress.config(value=atual, maximum=max(total, 1))
+        self.root.after(self.STATUS_INTERVAL_MS, self.drain_status)
+
+    def save_log_file(self):
+        # A tela guarda só as últimas LOG_MAX_LINES linhas (e, no log resumido,
+        # só avisos e erros): o log completo da sessão é o extrator.log
+        log_em_disco = next((h.baseFilename for h in logging.getLogger().handlers if isinstance(h, logging.FileHandler)), None)
+        log_content = None if log_em_disco else self.log_text.get("1.0", tk.END)
+        log_file_path = filedialog.asksaveasfilename(title="Salvar log", defaultextension=".log", filetypes=[("Log Files", "*.log"), ("Text Files", "*.txt")])
+        if log_file_path:
+            try:
+                if log_em_disco:
+                    for handler in logging.getLogger().handlers: handler.flush()
+                    shutil.copyfile(log_em_disco, log_file_path)
+                else:
+                    with open(log_file_path, 'w', encoding='utf-8') as f:
+                        f.write(log_content)
+                messagebox.showinfo("Sucesso", "Log salvo com sucesso.")
+            except Exception as e:
+                messagebox.showerror("Erro", f"Não foi possível salvar o log: {e}")
+    
+    def show_about(self):
+        messagebox.showinfo("Sobre o Extrator de Dados", "Versão: 1.00.00\nAutor: Luiz Fernando de Souza Freitas...")
+
+    def show_instructions(self):
+        instructions = """
+        Bem-vindo ao Extrator de Dados!
+
+        1. **Adicionar Pastas:**
+           - Clique em 'Adicionar Pasta' ou arraste e solte as pastas que contêm seus arquivos.
+
+        2. **Definir Tipos de Arquivo:**
+           - No campo 'Tipos de Arquivo', digite as extensões dos arquivos que deseja ler, separadas por vírgula (ex: .lis, .txt, .dat).
+
+        3. **Iniciar Processamento:**
+           - Se você adicionou várias pastas, o programa perguntará se quer consolidar tudo em UM ÚNICO ARQUIVO ou criar UM ARQUIVO POR PASTA.
+           - Escolha um local para salvar o(s) arquivo(s) de saída.
+
+        4. **Cancelar (Opcional):**
+           - Durante o processamento, o botão mudará para 'Cancelar'.
+
+        5. **Configurar Tags (Avançado):**
+           - No menu 'Editar -> Configurar Tags', você pode customizar as tags de busca.
+           - Depois da tag, use '|' para escolher o que capturar, ex:
+             BEGIN WRITE @WRITEMAXMIN # | campos=1-4 | casas=completo
+           - campos: colunas da linha seguinte (ou 'linha' para o texto todo);
+             casas: casas decimais ou 'completo'; modo: truncar ou arredondar;
+             faixa: números aceitos no '#' (padrão 1-99); nome: nome das colunas.
+           - Tags iniciadas por 're:' são expressões regulares.
+        """
+        messagebox.showinfo("Instruções", instructions)
+
+    def add_folder(self):
+        folder_path = filedialog.askdirectory(title="Selecione uma pasta")
+        if folder_path and folder_path not in self.folder_listbox.get(0, tk.END):
+            self.folder_listbox.insert(tk.END, folder_path)
+            self.btn_process.config(state='normal')
+
+    def remove_folder(self):
+        selected_indices = self.folder_listbox.curselection()
+        if selected_indices: self.folder_listbox.delete(selected_indices[0])
+        if self.folder_listbox.size() == 0: self.btn_process.config(state='disabled')
+
+    def handle_drop(self, event):
+        paths = self.root.tk.splitlist(event.data)
+        for path in paths:
+            if os.path.isdir(path) and path not in self.folder_listbox.get(0, tk.END):
+                self.folder_listbox.insert(tk.END, path)
+        if self.folder_listbox.size() > 0: self.btn_process.config(state='normal')
+
+    def restart_process(self):
+        self.folder_listbox.delete(0, tk.END)
+        self.log_text.config(state='normal'); self.log_text.delete(1.0, tk.END); self.log_text.config(state='disabled')
+        self.log("Interface reiniciada. Por favor, adicione novas pastas.")
+        self.btn_process.config(state='disabled')
+        self.set_ui_state('normal')
+        self.progress['value'] = 0
+
+    def set_ui_state(self, state):
+        self.ext_entry.config(state='normal' if state == 'normal' else 'disabled')
+        self.workers_spinbox.config(state='normal' if state == 'normal' else 'disabled')
+        self.cache_checkbutton.config(state='normal' if state == 'normal' else 'disabled')
+        for widget in [self.recursive_checkbutton, self.include_entry, self.exclude_entry, self.timeout_entry, self.max_size_entry, self.dedup_menu,
+                       self.read_ahead_spinbox]:
+            widget.config(state='normal' if state == 'normal' else 'disabled')
+        for widget in [self.btn_restart, self.btn_close]: widget.config(state=state)
+        folder_btn_frame = self.folder_listbox.master.winfo_children()[1]
+        for btn in folder_btn_frame.winfo_children(): btn.config(state=state)
+
+    def start_or_cancel_processing(self):
+        if self.processing_thread and self.processing_thread.is_alive():
+            self.log("CANCELAMENTO SOLICITADO PELO USUÁRIO...")
+            self.cancel_event.set()
+        else:
+            if not self.can_start(): return
+
+            batch_mode = 'single'
+            if self.folder_listbox.size() > 1:
+                dialog = BatchOptionDialog(self.root)
+                batch_mode = dialog.result
+                if not batch_mode: return
+
+            self.begin_run("Cancelar Processamento", self.process_files, batch_mode)
+
+    def can_start(self):
+        if not self.file_extensions_var.get().strip():
+            messagebox.showerror("Erro", "Por favor, especifique pelo menos um tipo de arquivo para ler.")
+            return False
+        try:
+            compilar_tags(tuple(self.tags))
+        except ValueError as e:
+            messagebox.showerror("Tag Inválida", f"Corrija as tags em 'Editar -> Configurar Tags':\n{e}")
+            return False
+        return True
+
+    def begin_run(self, button_text, target, *args):
+        self.cancel_event.clear()
+        self.btn_process.config(text=button_text)
+        self.set_ui_state('disabled')
+        self.log_text.config(state='normal'); self.log_text.delete(1.0, tk.END); self.log_text.config(state='disabled')
+        self.progress['value'] = 0
+        self.pending_progress = None
+
+        self.processing_thread = threading.Thread(target=target, args=args)
+        self.processing_thread.start()
+
+    def start_watch(self):
+        # O botão de processamento vira "Parar Observação" enquanto as pastas são observadas
+        if self.processing_thread and self.processing_thread.is_alive():
+            messagebox.showwarning("Aviso", "Aguarde o processamento atual terminar ou cancele-o.")
+            return
+        if self.folder_listbox.size() == 0:
+            messagebox.showwarning("Aviso", "Adicione pelo menos uma pasta para observar.")
+            return
+        if not self.can_start(): return
+        output = filedialog.asksaveasfilename(title="Acrescentar os novos arquivos em...", defaultextension=".csv",
+                                              filetypes=[("Arquivo CSV", "*.csv"), ("Arquivo Excel (uma parte por lote)", "*.xlsx")],
+                                              confirmoverwrite=False)
+        if not output: return
+        try:
+            observador = ObservadorPastas(self.folder_listbox.get(0, tk.END), self.tags, self.get_allowed_extensions(), output,
+                                          workers=self.get_workers(), recursivo=self.recursive_var.get(),
+                                          incluir=self.include_var.get().split(','), excluir=self.exclude_var.get().split(','),
+                                          cache=self.CACHE_FILE if self.use_cache_var.get() else None, cache_max_entradas=self.cache_max_entries,
+                                          cache_verificar_conteudo=self.cache_verify_var.get(),
+                                          log=self.log, cancel_event=self.cancel_event)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Não foi possível observar as pastas:\n{e}")
+            return
+        self.begin_run("Parar Observação", self.watch_files, observador)
+
+    def show_statistics(self):
+        # Mínimo, máximo e média de cada coluna de um resultado, sem abrir o Excel
+        path = filedialog.askopenfilename(title="Abrir resultado", filetypes=[("Resultados", "*.npz *.parquet *.csv"), ("Todos os arquivos", "*.*")])
+        if not path: return
+        try:
+            from tabela import TabelaResultados, formatar_estatisticas
+            tabela = TabelaResultados.carregar(path)
+        except ImportError:
+            messagebox.showerror("Erro", "As estatísticas requerem o pacote numpy (pip install numpy).")
+            return
+        except Exception as e:
+            messagebox.showerror("Erro", f"Não foi possível ler {os.path.basename(path)}:\n{e}")
+            return
+        self.log(f"--- Estatísticas de {os.path.basename(path)}: {len(tabela)} arquivo(s) ---")
+        for linha in formatar_estatisticas(tabela.estatisticas()): self.log(linha)
+
+    def watch_files(self, observador):
+        try:
+            observador.executar()
+        except Exception as e:
+            self.log(f"ERRO inesperado na observação: {e}")
+        finally:
+            self.reset_ui_after_processing()
+
+    def get_allowed_extensions(self):
+        return normalizar_extensoes(self.file_extensions_var.get())
+
+    def get_workers(self):
+        try:
+            return max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            return 1
+
+    def get_read_ahead(self):
+        try:
+            return max(0, int(self.read_ahead_var.get()))
+        except (tk.TclError, ValueError):
+            return 0
+
+    def get_limit(self, var):
+        # Campo vazio, zero ou inválido desativa o limite
+        try:
+            valor = float(var.get().replace(',', '.'))
+        except ValueError:
+            return None
+        return valor if valor > 0 else None
+
+    def update_progress(self, atual, total):
+        # Só o valor mais recente importa; drain_status aplica uma vez por intervalo
+        self.pending_progress = (atual, total)
+
+    def process_files(self, batch_mode):
+        # Um erro inesperado não pode deixar a tela presa em "Cancelar Processamento"
+        try:
+            self.run_batch(batch_mode)
+        except Exception as e:
+            self.log(f"ERRO inesperado no processamento: {e}")
+            messagebox.showerror("Erro", f"O processamento foi interrompido:\n{e}")
+        finally:
+            self.reset_ui_after_processing()
+
+    def run_batch(self, batch_mode):
+        folders_to_process = self.folder_listbox.get(0, tk.END)
+
+        if batch_mode == 'multiple':
+            output = filedialog.askdirectory(title="Selecione a pasta de destino para os arquivos")
+        else:
+            output = filedialog.asksaveasfilename(title="Salvar como...", defaultextension=".xlsx",
+                                                  filetypes=[("Arquivo Excel", "*.xlsx"), ("Arquivo CSV", "*.csv"),
+                                                             ("Tabela NumPy", "*.npz"), ("Arquivo Parquet", "*.parquet")])
+        if not output:
+            self.log("Processamento cancelado."); return
+        # Como na linha de comando: falta de numpy/pyarrow é avisada antes do lote
+        if output.endswith(('.npz', '.parquet')):
+            try:
+                from tabela import verificar_dependencias
+                verificar_dependencias(output)
+            except (ImportError, ValueError) as e:
+                self.log(f"ERRO: formato de saída indisponível: {e}")
+                messagebox.showerror("Formato Indisponível", f"Não é possível salvar em {os.path.splitext(output)[1]}:\n{e}")
+                return
+
+        max_size = self.get_limit(self.max_size_var)
+        resumo = processar_lote(folders_to_process, self.tags, self.get_allowed_extensions(), output,
+                                modo=batch_mode, workers=self.get_workers(), cancel_event=self.cancel_event,
+                                log=self.log, progresso=self.update_progress,
+                                cache=self.CACHE_FILE if self.use_cache_var.get() else None, cache_max_entradas=self.cache_max_entries,
+                                cache_verificar_conteudo=self.cache_verify_var.get(),
+                                recursivo=self.recursive_var.get(), incluir=self.include_var.get().split(','), excluir=self.exclude_var.get().split(','),
+                                tempo_limite=self.get_limit(self.timeout_var), tamanho_maximo=max_size * 2**20 if max_size else None,
+                                medir=self.timings_var.get(), perfil=self.profile_var.get(),
+                                deduplicar=self.DEDUP_OPTIONS.get(self.dedup_var.get()) or None,
+                                leitura_antecipada=self.get_read_ahead(), threads_leitura=self.read_threads)
+
+        for path, erro in resumo['save_errors']:
+            messagebox.showerror("Erro ao Salvar", f"Ocorreu um erro ao salvar {os.path.basename(path)}:\n{erro}")
+        if resumo['total'] == 0:
+            messagebox.showwarning("Aviso", "Nenhum arquivo correspondente foi encontrado nas pastas selecionadas.")
+        elif batch_mode == 'multiple':
+            if not resumo['cancelled']:
+                messagebox.showinfo("Sucesso", f"Processamento concluído! Os arquivos foram salvos em:\n{output}")
+        elif resumo['outputs']:
+            messagebox.showinfo("Sucesso", f"Dados salvos com sucesso em:\n{output}")
+        elif not resumo['cancelled'] and not resumo['save_errors']:
+            messagebox.showinfo("Concluído", "Nenhum dado válido foi encontrado para salvar.")
+
+    def reset_ui_after_processing(self):
+        self.root.after(0, self.btn_process.config, {'text': 'Iniciar Processamento'})
+        self.root.after(0, self.set_ui_state, 'normal')
+
+    def open_tag_config(self):
+        TagConfigWindow(self.root, self.tags)
+
+    def update_tags(self, new_tags):
+        self.tags = new_tags
+        self.save_config()
+        self.log("Lista de tags de busca foi atualizada.")
+        
+    def save_config(self):
+        config = configparser.ConfigParser()
+        folders = self.folder_listbox.get(0, tk.END)
+        config['DEFAULT'] = {'LastFolders': "\n".join(folders), 'FileExtensions': self.file_extensions_var.get(), 'Workers': str(self.get_workers()),
+                             'UseCache': str(self.use_cache_var.get()), 'Recursive': str(self.recursive_var.get()),
+                             'IncludePatterns': self.include_var.get(), 'ExcludePatterns': self.exclude_var.get(),
+                             'FileTimeout': self.timeout_var.get(), 'MaxFileSizeMB': self.max_size_var.get(),
+                             'QuietLog': str(self.quiet_var.get()), 'Timings': str(self.timings_var.get()),
+                             'Profile': str(self.profile_var.get()), 'Deduplicate': self.DEDUP_OPTIONS.get(self.dedup_var.get(), ''),
+                             'ReadAhead': str(self.get_read_ahead()), 'ReadThreads': str(self.read_threads),
+                             'CacheVerifyContent': str(self.cache_verify_var.get())}
+        if self.cache_max_entries: config['DEFAULT']['CacheMaxEntries'] = str(self.cache_max_entries)
+        config['TAGS'] = {'SearchTags': "\n".join(self.tags)}
+        with open(self.CONFIG_FILE, 'w') as configfile: config.write(configfile)
+
+    def load_config(self):
+        default_tags = ["BEGIN WRITE @WRITEMAXMIN #"]
+        if os.path.exists(self.CONFIG_FILE):
+            config = configparser.ConfigParser()
+            config.read(self.CONFIG_FILE)
+            for folder in config['DEFAULT'].get('LastFolders', '').split("\n"):
+                if os.path.isdir(folder): self.folder_listbox.insert(tk.END, folder)
+            self.file_extensions_var.set(config['DEFAULT'].get('FileExtensions', '.lis'))
+            self.workers_var.set(config['DEFAULT'].getint('Workers', fallback=os.cpu_count() or 1))
+            self.use_cache_var.set(config['DEFAULT'].getboolean('UseCache', fallback=True))
+            self.cache_max_entries = config['DEFAULT'].getint('CacheMaxEntries', fallback=None)
+            self.cache_verify_var.set(config['DEFAULT'].getboolean('CacheVerifyContent', fallback=False))
+            self.recursive_var.set(config['DEFAULT'].getboolean('Recursive', fallback=False))
+            self.include_var.set(config['DEFAULT'].get('IncludePatterns', ''))
+            self.exclude_var.set(config['DEFAULT'].get('ExcludePatterns', ''))
+            self.timeout_var.set(config['DEFAULT'].get('FileTimeout', ''))
+            self.max_size_var.set(config['DEFAULT'].get('MaxFileSizeMB', ''))
+            self.quiet_var.set(config['DEFAULT'].getboolean('QuietLog', fallback=False))
+            self.timings_var.set(config['DEFAULT'].getboolean('Timings', fallback=False))
+            self.profile_var.set(config['DEFAULT'].getboolean('Profile', fallback=False))
+            self.read_ahead_var.set(config['DEFAULT'].getint('ReadAhead', fallback=0))
+            self.read_threads = config['DEFAULT'].getint('ReadThreads', fallback=4)
+            dedup = config['DEFAULT'].get('Deduplicate', '')
+            self.dedup_var.set(next((texto for texto, valor in self.DEDUP_OPTIONS.items() if valor == dedup), "Ler todos"))
+            self.tags = config['TAGS'].get('SearchTags', "\n".join(default_tags)).split("\n")
+            if not self.tags or self.tags == ['']: self.tags = default_tags
+        else:
+            self.tags = default_tags
+            self.file_extensions_var.set('.lis')
+        
+        if self.folder_listbox.size() > 0: self.btn_process.config(state='normal')
+
+    def on_closing(self):
+        self.cancel_event.set()
+        self.save_config()
+        self.root.destroy()
+
+def main():
+    root = TkinterDnD.Tk()
+    app = App(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
+    root.mainloop()
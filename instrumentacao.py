@@ -0,0 +1,86 @@
+import csv
+import json
+import math
+
+# Etapas medidas em um lote. 'discover' é medida por pasta listada; 'read',
+# 'match' e 'parse' por arquivo extraído; 'write' por linha gravada na saída;
+# 'save' por arquivo de saída fechado (a planilha .xlsx é montada só aí).
+ETAPAS = ('discover', 'read', 'match', 'parse', 'write', 'save')
+COLUNAS_CSV = ['path', 'bytes', 'duration_s', 'read_s', 'match_s', 'parse_s', 'write_s', 'source', 'error']
+# Origem de cada arquivo na coluna 'source': 'extracted' (medidas do processo
+# de trabalho), 'cache', 'copy' (arquivo repetido) ou o motivo informado pela
+# extração supervisionada ('timeout', 'too_large', 'crash')
+
+def medidas_vazias():
+    return {'bytes': 0, 'read': 0.0, 'match': 0.0, 'parse': 0.0, 'total': 0.0}
+
+def percentil(valores_ordenados, p):
+    # Método do posto mais próximo: sempre devolve um valor realmente medido
+    if not valores_ordenados: return 0.0
+    posto = max(1, math.ceil(p / 100 * len(valores_ordenados)))
+    return valores_ordenados[posto - 1]
+
+# --- MEDIÇÃO POR ETAPA ---
+class MedidorEtapas:
+    # Junta os tempos de um lote. As medidas da extração chegam dos processos
+    # de trabalho com registrar_extracao() (ou só a duração, com
+    # registrar_interrupcao(), quando o supervisor descarta o arquivo) e viram
+    # registro do arquivo em concluir_arquivo(), quando o tempo de gravação já
+    # é conhecido.
+    def __init__(self):
+        self.etapas = {etapa: [] for etapa in ETAPAS}
+        self.arquivos = [] # Uma linha de COLUNAS_CSV por arquivo
+        self._medidas = {}
+        self._interrupcoes = {} # caminho -> (segundos, motivo)
+
+    def registrar(self, etapa, segundos):
+        self.etapas[etapa].append(segundos)
+
+    def registrar_extracao(self, caminho, medidas):
+        self._medidas[caminho] = medidas
+
+    def registrar_interrupcao(self, caminho, segundos, motivo):
+        self._interrupcoes[caminho] = (segundos, motivo)
+
+    def concluir_arquivo(self, caminho, escrita=None, erro=None, copia=False):
+        medidas = self._medidas.pop(caminho, None)
+        interrupcao = self._interrupcoes.pop(caminho, None)
+        if medidas is not None:
+            origem = 'extracted'
+            for etapa in ('read', 'match', 'parse'): self.etapas[etapa].append(medidas[etapa])
+        else:
+            medidas = medidas_vazias()
+            if interrupcao is not None: medidas['total'], origem = interrupcao
+            else: origem = 'copy' if copia else 'cache'
+        if escrita is not None: self.etapas['write'].append(escrita)
+        self.arquivos.append([caminho, medidas['bytes'], round(medidas['total'], 6), round(medidas['read'], 6),
+                              round(medidas['match'], 6), round(medidas['parse'], 6),
+                              round(escrita, 6) if escrita is not None else '', origem, erro or ''])
+
+    def resumo(self):
+        # {etapa: {count, total_s, p50_s, p95_s, max_s}} para as etapas com medidas
+        resumo = {}
+        duracoes = [linha[2] for linha in self.arquivos if linha[7] not in ('cache', 'copy', 'too_large')]
+        for etapa, valores in list(self.etapas.items()) + [('file', duracoes)]:
+            if not valores: continue
+            valores = sorted(valores)
+            resumo[etapa] = {'count': len(valores), 'total_s': round(sum(valores), 6), 'p50_s': round(percentil(valores, 50), 6),
+                             'p95_s': round(percentil(valores, 95), 6), 'max_s': round(valores[-1], 6)}
+        return resumo
+
+    def linhas_resumo(self):
+        for etapa, dados in self.resumo().items():
+            yield (f"Etapa {etapa}: {dados['count']} medida(s), total {dados['total_s']:.3f} s, "
+                   f"p50 {dados['p50_s'] * 1000:.2f} ms, p95 {dados['p95_s'] * 1000:.2f} ms, máx {dados['max_s'] * 1000:.2f} ms")
+
+    def exportar(self, base):
+        # Grava base.json (resumo e medidas por etapa) e base.csv (uma linha por arquivo)
+        caminho_json, caminho_csv = base + '.json', base + '.csv'
+        with open(caminho_json, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.resumo(), 'files': len(self.arquivos),
+                       'bytes': sum(linha[1] for linha in self.arquivos)}, f, indent=2)
+        with open(caminho_csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUNAS_CSV)
+            writer.writerows(self.arquivos)
+        return [caminho_json, caminho_csv]
@@ -1,432 +1,205 @@
 import os
-import openpyxl
-import csv
-import threading
-import subprocess
 import sys
+import json
+import signal
+import threading
+import argparse
 import configparser
 import logging
-import tkinter as tk
-from tkinter import simpledialog, filedialog, messagebox, scrolledtext
-from tkinter.ttk import Progressbar
-from tkinterdnd2 import DND_FILES, TkinterDnD
-
-# --- CONFIGURAÇÃO DO LOG ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', filename='extrator.log', filemode='w')
+import multiprocessing
 
-# --- JANELA DE OPÇÃO DE MODO LOTE ---
-class BatchOptionDialog(tk.Toplevel):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.title("Opção de Processamento em Lote")
-        self.geometry("350x150")
-        self.transient(parent)
-        self.grab_set()
-        self.result = None
-        tk.Label(self, text="Você selecionou múltiplas pastas.\nComo deseja salvar os arquivos de saída?", justify='center').pack(pady=15)
-        btn_frame = tk.Frame(self)
-        btn_frame.pack(pady=10)
-        tk.Button(btn_frame, text="Um Único Arquivo", command=lambda: self.set_result('single')).pack(side='left', padx=10)
-        tk.Button(btn_frame, text="Um Arquivo por Pasta", command=lambda: self.set_result('multiple')).pack(side='left', padx=10)
-        tk.Button(self, text="Cancelar", command=self.destroy).pack(pady=5)
-        self.wait_window(self)
-    def set_result(self, result):
-        self.result = result
-        self.destroy()
+CONFIG_FILE = 'config.ini'
+CACHE_FILE = 'extrator_cache.sqlite'
+DEFAULT_TAGS = ["BEGIN WRITE @WRITEMAXMIN #"]
 
-# --- JANELA DE CONFIGURAÇÃO DE TAGS ---
-class TagConfigWindow(tk.Toplevel):
-    def __init__(self, parent, tags):
-        super().__init__(parent)
-        self.title("Configurar Tags de Busca")
-        self.geometry("500x400")
-        self.transient(parent)
-        self.grab_set()
-        self.tags = list(tags)
-        self.parent = parent
-        tk.Label(self, text="Tags para extração (use # como curinga para o número):").pack(pady=5)
-        list_frame = tk.Frame(self)
-        list_frame.pack(fill='both', expand=True, padx=10, pady=5)
-        self.listbox = tk.Listbox(list_frame)
-        self.listbox.pack(side='left', fill='both', expand=True)
-        scrollbar = tk.Scrollbar(list_frame, orient='vertical', command=self.listbox.yview)
-        scrollbar.pack(side='right', fill='y')
-        self.listbox.config(yscrollcommand=scrollbar.set)
-        for tag in self.tags: self.listbox.insert(tk.END, tag)
-        btn_frame = tk.Frame(self)
-        btn_frame.pack(pady=10)
-        tk.Button(btn_frame, text="Adicionar", command=self.add_tag).pack(side='left', padx=5)
-        tk.Button(btn_frame, text="Remover", command=self.remove_tag).pack(side='left', padx=5)
-        tk.Button(self, text="Salvar e Fechar", command=self.save_and_close).pack(pady=10)
-    def add_tag(self):
-        new_tag = simpledialog.askstring("Adicionar Tag", "Digite a nova tag:", parent=self)
-        if new_tag and new_tag not in self.tags:
-            self.tags.append(new_tag)
-            self.listbox.insert(tk.END, new_tag)
-    def remove_tag(self):
-        selected_indices = self.listbox.curselection()
-        if not selected_indices: return
-        self.tags.remove(self.listbox.get(selected_indices[0]))
-        self.listbox.delete(selected_indices[0])
-    def save_and_close(self):
-        self.parent.update_tags(self.tags)
-        self.destroy()
-
-# --- LÓGICA PRINCIPAL ---
-def extrair_dados_lis(caminho_arquivo, tags_template):
+# --- LINHA DE COMANDO ---
+def _ler_limite(texto):
+    # A interface gráfica grava vazio quando não há limite
     try:
-        with open(caminho_arquivo, 'r', encoding='latin-1', errors='ignore') as f:
-            content = f.read()
-            if not any(tag.split('#')[0] in content for tag in tags_template):
-                return "Arquivo inválido (não contém tags esperadas)", None
-    except Exception as e:
-        return f"Não foi possível ler o arquivo: {e}", None
-    all_tags_to_search = []
-    for template in tags_template:
-        if "#" in template:
-            base = template.split('#')[0]
-            all_tags_to_search.extend([f"{base}{i}.0" for i in range(1, 10)])
-            all_tags_to_search.extend([f"{base}{i}." for i in range(10, 100)])
-        else:
-            all_tags_to_search.append(template)
-    numeros_encontrados = []
-    with open(caminho_arquivo, 'r', encoding='latin-1', errors='ignore') as f:
-        linhas = [linha.strip() for linha in f.readlines()]
-    for tag_inicio in all_tags_to_search:
-        valor_numerico = None
-        try:
-            indice_tag = linhas.index(tag_inicio)
-            if indice_tag + 1 < len(linhas):
-                linha_com_numero = linhas[indice_tag + 1]
-                primeiro_numero_str = linha_com_numero.strip().split()[0]
-                if '.' in primeiro_numero_str:
-                    numero_truncado_str = primeiro_numero_str[:primeiro_numero_str.find('.') + 2]
-                else:
-                    numero_truncado_str = primeiro_numero_str
-                if numero_truncado_str:
-                    valor_numerico = float(numero_truncado_str)
-        except (ValueError, IndexError): pass
-        numeros_encontrados.append(valor_numerico)
-    return None, numeros_encontrados
-
-# --- APLICAÇÃO GRÁFICA ---
-class App:
-    CONFIG_FILE = 'config.ini'
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Extrator de Dados v1.00.00")
-        self.root.geometry("700x650") # Aumentei a altura para o novo campo
-        self.processing_thread = None
-        self.cancel_event = threading.Event()
-
-        self.file_extensions_var = tk.StringVar() # Variável para os tipos de arquivo
-
-        self.create_menu()
-        self.create_widgets()
-        self.load_config()
-        self.root.drop_target_register(DND_FILES)
-        self.root.dnd_bind('<<Drop>>', self.handle_drop)
-
-    def create_menu(self):
-        menubar = tk.Menu(self.root)
-        file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label="Salvar Log Como...", command=self.save_log_file)
-        file_menu.add_separator()
-        file_menu.add_command(label="Sair", command=self.on_closing)
-        menubar.add_cascade(label="Arquivo", menu=file_menu)
-        edit_menu = tk.Menu(menubar, tearoff=0)
-        edit_menu.add_command(label="Configurar Tags...", command=self.open_tag_config)
-        menubar.add_cascade(label="Editar", menu=edit_menu)
-        help_menu = tk.Menu(menubar, tearoff=0)
-        help_menu.add_command(label="Instruções", command=self.show_instructions)
-        help_menu.add_command(label="Sobre...", command=self.show_about)
-        menubar.add_cascade(label="Ajuda", menu=help_menu)
-        self.root.config(menu=menubar)
-
-    def create_widgets(self):
-        top_frame = tk.Frame(self.root, padx=10, pady=10)
-        top_frame.pack(fill='x')
-        tk.Label(top_frame, text="Arraste e solte as pastas com os arquivos aqui:").pack(anchor='w')
-        
-        folder_list_frame = tk.Frame(self.root, padx=10)
-        folder_list_frame.pack(fill='x')
-        self.folder_listbox = tk.Listbox(folder_list_frame, height=5)
-        self.folder_listbox.pack(side='left', fill='x', expand=True)
-        folder_btn_frame = tk.Frame(folder_list_frame, padx=5)
-        folder_btn_frame.pack(side='left')
-        tk.Button(folder_btn_frame, text="Adicionar Pasta...", command=self.add_folder).pack(pady=2)
-        tk.Button(folder_btn_frame, text="Remover Pasta", command=self.remove_folder).pack(pady=2)
-
-        # --- NOVO CAMPO PARA TIPOS DE ARQUIVO ---
-        ext_frame = tk.Frame(self.root, padx=10, pady=5)
-        ext_frame.pack(fill='x')
-        tk.Label(ext_frame, text="Tipos de Arquivo (separados por vírgula):").pack(side='left', padx=(0, 5))
-        self.ext_entry = tk.Entry(ext_frame, textvariable=self.file_extensions_var)
-        self.ext_entry.pack(fill='x', expand=True)
-
-        self.btn_process = tk.Button(self.root, text="Iniciar Processamento", command=self.start_or_cancel_processing, state='disabled')
-        self.btn_process.pack(pady=10)
-        
-        log_frame = tk.Frame(self.root, padx=10, pady=5)
-        log_frame.pack(fill='both', expand=True)
-        self.log_text = scrolledtext.ScrolledText(log_frame, state='disabled', height=10)
-        self.log_text.pack(fill='both', expand=True)
-        
-        self.progress = Progressbar(self.root, orient='horizontal', mode='determinate')
-        self.progress.pack(fill='x', padx=10, pady=5)
-        
-        bottom_frame = tk.Frame(self.root, padx=10, pady=10)
-        bottom_frame.pack(fill='x')
-        self.btn_restart = tk.Button(bottom_frame, text="Limpar e Reiniciar", command=self.restart_process)
-        self.btn_restart.pack(side='left', expand=True, fill='x', padx=5)
-        self.btn_close = tk.Button(bottom_frame, text="Fechar", command=self.on_closing)
-        self.btn_close.pack(side='left', expand=True, fill='x', padx=5)
-
-    def log(self, message):
-        self.root.after(0, self._log_thread_safe, message)
-
-    def _log_thread_safe(self, message):
-        logging.info(message)
-        self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + '\n')
-        self.log_text.config(state='disabled')
-        self.log_text.see(tk.END)
-
-    def save_log_file(self):
-        log_content = self.log_text.get("1.0", tk.END)
-        log_file_path = filedialog.asksaveasfilename(title="Salvar log", defaultextension=".log", filetypes=[("Log Files", "*.log"), ("Text Files", "*.txt")])
-        if log_file_path:
-            try:
-                with open(log_file_path, 'w', encoding='utf-8') as f:
-                    f.write(log_content)
-                messagebox.showinfo("Sucesso", "Log salvo com sucesso.")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Não foi possível salvar o log: {e}")
-    
-    def show_about(self):
-        messagebox.showinfo("Sobre o Extrator de Dados", "Versão: 1.00.00\nAutor: Luiz Fernando de Souza Freitas...")
-
-    def show_instructions(self):
-        instructions = """
-        Bem-vindo ao Extrator de Dados!
-
-        1. **Adicionar Pastas:**
-           - Clique em 'Adicionar Pasta' ou arraste e solte as pastas que contêm seus arquivos.
-
-        2. **Definir Tipos de Arquivo:**
-           - No campo 'Tipos de Arquivo', digite as extensões dos arquivos que deseja ler, separadas por vírgula (ex: .lis, .txt, .dat).
-
-        3. **Iniciar Processamento:**
-           - Se você adicionou várias pastas, o programa perguntará se quer consolidar tudo em UM ÚNICO ARQUIVO ou criar UM ARQUIVO POR PASTA.
-           - Escolha um local para salvar o(s) arquivo(s) de saída.
-
-        4. **Cancelar (Opcional):**
-           - Durante o processamento, o botão mudará para 'Cancelar'.
-
-        5. **Configurar Tags (Avançado):**
-           - No menu 'Editar -> Configurar Tags', você pode customizar as tags de busca.
-        """
-        messagebox.showinfo("Instruções", instructions)
-
-    def add_folder(self):
-        folder_path = filedialog.askdirectory(title="Selecione uma pasta")
-        if folder_path and folder_path not in self.folder_listbox.get(0, tk.END):
-            self.folder_listbox.insert(tk.END, folder_path)
-            self.btn_process.config(state='normal')
-
-    def remove_folder(self):
-        selected_indices = self.folder_listbox.curselection()
-        if selected_indices: self.folder_listbox.delete(selected_indices[0])
-        if self.folder_listbox.size() == 0: self.btn_process.config(state='disabled')
-
-    def handle_drop(self, event):
-        paths = self.root.tk.splitlist(event.data)
-        for path in paths:
-            if os.path.isdir(path) and path not in self.folder_listbox.get(0, tk.END):
-                self.folder_listbox.insert(tk.END, path)
-        if self.folder_listbox.size() > 0: self.btn_process.config(state='normal')
-
-    def restart_process(self):
-        self.folder_listbox.delete(0, tk.END)
-        self.log_text.config(state='normal'); self.log_text.delete(1.0, tk.END); self.log_text.config(state='disabled')
-        self.log("Interface reiniciada. Por favor, adicione novas pastas.")
-        self.btn_process.config(state='disabled')
-        self.set_ui_state('normal')
-        self.progress['value'] = 0
-
-    def set_ui_state(self, state):
-        self.ext_entry.config(state='normal' if state == 'normal' else 'disabled')
-        for widget in [self.btn_restart, self.btn_close]: widget.config(state=state)
-        folder_btn_frame = self.folder_listbox.master.winfo_children()[1]
-        for btn in folder_btn_frame.winfo_children(): btn.config(state=state)
-
-    def start_or_cancel_processing(self):
-        if self.processing_thread and self.processing_thread.is_alive():
-            self.log("CANCELAMENTO SOLICITADO PELO USUÁRIO...")
-            self.cancel_event.set()
-        else:
-            if not self.file_extensions_var.get().strip():
-                messagebox.showerror("Erro", "Por favor, especifique pelo menos um tipo de arquivo para ler.")
-                return
-
-            batch_mode = 'single'
-            if self.folder_listbox.size() > 1:
-                dialog = BatchOptionDialog(self.root)
-                batch_mode = dialog.result
-                if not batch_mode: return
-
-            self.cancel_event.clear()
-            self.btn_process.config(text="Cancelar Processamento")
-            self.set_ui_state('disabled')
-            self.log_text.config(state='normal'); self.log_text.delete(1.0, tk.END); self.log_text.config(state='disabled')
-            self.progress['value'] = 0
-            
-            self.processing_thread = threading.Thread(target=self.process_files, args=(batch_mode,))
-            self.processing_thread.start()
-
-    def get_allowed_extensions(self):
-        # Pega a string, divide por vírgula, limpa espaços e garante que começa com '.'
-        ext_string = self.file_extensions_var.get().lower()
-        return [f".{ext.strip().lstrip('.')}" for ext in ext_string.split(',') if ext.strip()]
-
-    def find_files_to_process(self, folders):
-        allowed_extensions = self.get_allowed_extensions()
-        files_to_process = []
-        for folder in folders:
-            for f in os.listdir(folder):
-                if any(f.lower().endswith(ext) for ext in allowed_extensions):
-                    files_to_process.append(os.path.join(folder, f))
-        return files_to_process
-
-    def process_files(self, batch_mode):
-        folders_to_process = self.folder_listbox.get(0, tk.END)
-        
-        if batch_mode == 'multiple':
-            output_dir = filedialog.askdirectory(title="Selecione a pasta de destino para os arquivos")
-            if not output_dir:
-                self.log("Processamento cancelado."); self.reset_ui_after_processing(); return
-            
-            all_files_for_progress = self.find_files_to_process(folders_to_process)
-            total_files = len(all_files_for_progress)
-            self.progress['maximum'] = total_files
-            processed_count = 0
-
-            self.log(f"Modo de lote: Um arquivo por pasta. Salvando em: {output_dir}")
-            for folder_path in folders_to_process:
-                if self.cancel_event.is_set(): break
-                self.log(f"--- Processando pasta: {os.path.basename(folder_path)} ---")
-                folder_files = self.find_files_to_process([folder_path])
-                
-                all_data = []
-                for file_path in folder_files:
-                    if self.cancel_event.is_set(): break
-                    self.log(f"Lendo ({processed_count+1}/{total_files}): {os.path.basename(file_path)}")
-                    erro, dados = extrair_dados_lis(file_path, self.tags)
-                    if erro: self.log(f"AVISO: {os.path.basename(file_path)} - {erro}.")
-                    elif dados: all_data.append([file_path, os.path.basename(file_path)] + dados)
-                    processed_count += 1
-                    self.root.after(0, self.progress.config, {'value': processed_count})
-                
-                if all_data:
-                    output_filename = f"dados_extraidos_{os.path.basename(folder_path)}.xlsx"
-                    self.save_data(all_data, os.path.join(output_dir, output_filename))
-            
-            if not self.cancel_event.is_set():
-                messagebox.showinfo("Sucesso", f"Processamento concluído! Os arquivos foram salvos em:\n{output_dir}")
-
-        else: # Modo 'single'
-            output_file_path = filedialog.asksaveasfilename(title="Salvar como...", defaultextension=".xlsx", filetypes=[("Arquivo Excel", "*.xlsx"), ("Arquivo CSV", "*.csv")])
-            if not output_file_path:
-                self.log("Processamento cancelado."); self.reset_ui_after_processing(); return
-                
-            all_files_to_process = self.find_files_to_process(folders_to_process)
-            total_files = len(all_files_to_process)
-            if total_files == 0:
-                self.log("Nenhum arquivo com as extensões especificadas foi encontrado.")
-                messagebox.showwarning("Aviso", "Nenhum arquivo correspondente foi encontrado nas pastas selecionadas.")
-                self.reset_ui_after_processing()
-                return
-
-            self.progress['maximum'] = total_files
-            all_data = []
-            
-            self.log("Iniciando o processamento (modo de arquivo único)...")
-            for i, file_path in enumerate(all_files_to_process):
-                if self.cancel_event.is_set(): break
-                self.log(f"Lendo ({i+1}/{total_files}): {os.path.basename(file_path)}")
-                erro, dados = extrair_dados_lis(file_path, self.tags)
-                if erro: self.log(f"AVISO: {os.path.basename(file_path)} - {erro}.")
-                elif dados: all_data.append([file_path, os.path.basename(file_path)] + dados)
-                self.root.after(0, self.progress.config, {'value': i + 1})
-            
-            if all_data:
-                self.save_data(all_data, output_file_path)
-                messagebox.showinfo("Sucesso", f"Dados salvos com sucesso em:\n{output_file_path}")
-            elif not self.cancel_event.is_set():
-                messagebox.showinfo("Concluído", "Nenhum dado válido foi encontrado para salvar.")
-
-        self.reset_ui_after_processing()
-
-    def save_data(self, data, path):
-        header = ["Caminho do Arquivo", "Nome do Arquivo"] + [f"Valor_{i}" for i in range(1, 100)]
-        try:
-            if path.endswith('.xlsx'):
-                workbook = openpyxl.Workbook()
-                sheet = workbook.active
-                sheet.append(header)
-                for row in data: sheet.append(row)
-                workbook.save(path)
-            elif path.endswith('.csv'):
-                with open(path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(header)
-                    writer.writerows(data)
-            self.log(f"Arquivo salvo com sucesso em: {path}")
-        except Exception as e:
-            self.log(f"ERRO ao salvar o arquivo {path}: {e}")
-            messagebox.showerror("Erro ao Salvar", f"Ocorreu um erro ao salvar {os.path.basename(path)}:\n{e}")
-
-    def reset_ui_after_processing(self):
-        self.root.after(0, self.btn_process.config, {'text': 'Iniciar Processamento'})
-        self.root.after(0, self.set_ui_state, 'normal')
-
-    def open_tag_config(self):
-        TagConfigWindow(self.root, self.tags)
-
-    def update_tags(self, new_tags):
-        self.tags = new_tags
-        self.save_config()
-        self.log("Lista de tags de busca foi atualizada.")
-        
-    def save_config(self):
+        valor = float(texto.replace(',', '.'))
+    except ValueError:
+        return None
+    return valor if valor > 0 else None
+
+def carregar_padroes(config_file=CONFIG_FILE):
+    # Usa o mesmo config.ini da interface gráfica como padrão da linha de comando
+    padroes = {'tags': list(DEFAULT_TAGS), 'extensoes': '.lis', 'workers': os.cpu_count() or 1, 'cache': True, 'cache_max': None, 'cache_verificar': False,
+               'recursivo': False, 'incluir': [], 'excluir': [], 'tempo_limite': None, 'tamanho_maximo': None, 'pastas': [],
+               'deduplicar': None, 'leitura_antecipada': 0, 'threads_leitura': 4}
+    if os.path.exists(config_file):
         config = configparser.ConfigParser()
-        folders = self.folder_listbox.get(0, tk.END)
-        config['DEFAULT'] = {'LastFolders': "\n".join(folders), 'FileExtensions': self.file_extensions_var.get()}
-        config['TAGS'] = {'SearchTags': "\n".join(self.tags)}
-        with open(self.CONFIG_FILE, 'w') as configfile: config.write(configfile)
-
-    def load_config(self):
-        default_tags = ["BEGIN WRITE @WRITEMAXMIN #"]
-        if os.path.exists(self.CONFIG_FILE):
-            config = configparser.ConfigParser()
-            config.read(self.CONFIG_FILE)
-            for folder in config['DEFAULT'].get('LastFolders', '').split("\n"):
-                if os.path.isdir(folder): self.folder_listbox.insert(tk.END, folder)
-            self.file_extensions_var.set(config['DEFAULT'].get('FileExtensions', '.lis'))
-            self.tags = config['TAGS'].get('SearchTags', "\n".join(default_tags)).split("\n")
-            if not self.tags or self.tags == ['']: self.tags = default_tags
-        else:
-            self.tags = default_tags
-            self.file_extensions_var.set('.lis')
-        
-        if self.folder_listbox.size() > 0: self.btn_process.config(state='normal')
-
-    def on_closing(self):
-        self.save_config()
-        self.root.destroy()
+        config.read(config_file)
+        padroes['extensoes'] = config['DEFAULT'].get('FileExtensions', '.lis') or '.lis'
+        padroes['deduplicar'] = {'unico': 'unique', 'todos': 'all'}.get(config['DEFAULT'].get('Deduplicate', ''))
+        padroes['leitura_antecipada'] = config['DEFAULT'].getint('ReadAhead', fallback=0)
+        padroes['threads_leitura'] = config['DEFAULT'].getint('ReadThreads', fallback=4)
+        padroes['pastas'] = [p for p in config['DEFAULT'].get('LastFolders', '').split("\n") if p]
+        padroes['workers'] = config['DEFAULT'].getint('Workers', fallback=padroes['workers'])
+        padroes['cache'] = config['DEFAULT'].getboolean('UseCache', fallback=True)
+        padroes['cache_max'] = config['DEFAULT'].getint('CacheMaxEntries', fallback=None)
+        padroes['cache_verificar'] = config['DEFAULT'].getboolean('CacheVerifyContent', fallback=False)
+        padroes['recursivo'] = config['DEFAULT'].getboolean('Recursive', fallback=False)
+        padroes['incluir'] = [p for p in config['DEFAULT'].get('IncludePatterns', '').split(',') if p.strip()]
+        padroes['excluir'] = [p for p in config['DEFAULT'].get('ExcludePatterns', '').split(',') if p.strip()]
+        padroes['tempo_limite'] = _ler_limite(config['DEFAULT'].get('FileTimeout', ''))
+        padroes['tamanho_maximo'] = _ler_limite(config['DEFAULT'].get('MaxFileSizeMB', ''))
+        if config.has_section('TAGS'):
+            tags = [tag for tag in config['TAGS'].get('SearchTags', '').split("\n") if tag]
+            if tags: padroes['tags'] = tags
+    return padroes
+
+def _argumentos_comuns(comando, padroes):
+    # Opções de busca e extração compartilhadas por 'extract' e 'watch'
+    comando.add_argument("--ext", default=padroes['extensoes'], help="Tipos de arquivo, separados por vírgula (padrão: %(default)s)")
+    comando.add_argument("--tags", nargs='+', default=padroes['tags'], help="Tags de busca (use # como curinga para o número; opções após '|', ex: 'TAG # | campos=1-3 | casas=completo')")
+    comando.add_argument("-r", "--recursive", action='store_true', default=padroes['recursivo'], help="Inclui as subpastas")
+    # Padrões da linha de comando substituem os do config.ini, em vez de somar a eles
+    comando.add_argument("--include", action='append', metavar="GLOB", help="Só processa arquivos que casam com o padrão (nome ou caminho relativo); substitui IncludePatterns do config.ini")
+    comando.add_argument("--exclude", action='append', metavar="GLOB", help="Ignora arquivos e subpastas que casam com o padrão; substitui ExcludePatterns do config.ini")
+    comando.set_defaults(include_config=padroes['incluir'], exclude_config=padroes['excluir'])
+    comando.add_argument("-j", "--jobs", type=int, default=padroes['workers'], help="Processos em paralelo (padrão: %(default)s)")
+    comando.add_argument("-q", "--quiet", action='store_true', help="Mostra só avisos e erros")
+    comando.add_argument("--no-cache", dest="cache", action='store_false', default=padroes['cache'], help="Não usa o cache de resultados")
+    comando.add_argument("--cache-file", default=CACHE_FILE, help="Banco do cache de resultados, ao lado do config.ini (padrão: %(default)s)")
+    comando.add_argument("--cache-max", type=int, default=padroes['cache_max'], help="Máximo de entradas no cache")
+    comando.add_argument("--cache-verify-content", action='store_true', default=padroes['cache_verificar'],
+                         help="Reaproveita o cache de arquivos com data alterada mas mesmo conteúdo (compara o hash)")
+
+def criar_parser():
+    padroes = carregar_padroes()
+    parser = argparse.ArgumentParser(prog="main.py", description="Extrator de Dados (sem argumentos abre a interface gráfica)")
+    sub = parser.add_subparsers(dest="comando")
+    extract = sub.add_parser("extract", help="Extrai os dados das pastas sem abrir a interface gráfica")
+    extract.add_argument("folders", nargs='+', help="Pastas com os arquivos a processar")
+    extract.add_argument("-o", "--output", required=True, help="Arquivo de saída .xlsx/.csv, ou .npz/.parquet com numpy (ou pasta, com --per-folder)")
+    extract.add_argument("--per-folder", action='store_true', help="Gera um .xlsx por pasta dentro da pasta indicada em -o")
+    _argumentos_comuns(extract, padroes)
+    extract.add_argument("--timeout", type=float, default=padroes['tempo_limite'], metavar="SEGUNDOS", help="Desiste do arquivo que levar mais que isso para ser lido")
+    extract.add_argument("--max-size", type=float, default=padroes['tamanho_maximo'], metavar="MB", help="Ignora arquivos maiores que isso")
+    extract.add_argument("--dedup", choices=['unique', 'all'], default=padroes['deduplicar'],
+                         help="Lê uma vez só arquivos com o mesmo conteúdo: 'unique' grava uma linha por conteúdo, 'all' uma por cópia")
+    extract.add_argument("--read-ahead", type=int, default=padroes['leitura_antecipada'], metavar="N",
+                         help="Lê até N arquivos à frente da análise, útil em pastas de rede (padrão: %(default)s, desligado)")
+    extract.add_argument("--read-threads", type=int, default=padroes['threads_leitura'], metavar="N", help="Threads de leitura com --read-ahead (padrão: %(default)s)")
+    extract.add_argument("--timings", action='store_true', help="Mede cada etapa e salva o relatório (_perfil.json/.csv) ao lado da saída")
+    extract.add_argument("--profile", action='store_true', help="Grava um perfil cProfile (_perfil.prof) ao lado da saída; use -j 1 --read-ahead 0, sem --timeout/--max-size, para incluir a extração")
+    watch = sub.add_parser("watch", help="Observa as pastas e acrescenta à saída os arquivos novos, até Ctrl+C")
+    watch.add_argument("folders", nargs='*', default=padroes['pastas'], help="Pastas a observar (padrão: as últimas usadas na interface)")
+    watch.add_argument("-o", "--output", required=True, help="Arquivo .csv que recebe as linhas (ou .xlsx, gravado em partes _0001, _0002...)")
+    watch.add_argument("--interval", type=float, default=2.0, metavar="SEGUNDOS", help="Intervalo entre as varreduras (padrão: %(default)s)")
+    watch.add_argument("--settle", type=float, default=2.0, metavar="SEGUNDOS", help="Tempo sem mudanças para um arquivo ser lido (padrão: %(default)s)")
+    watch.add_argument("--batch-max", type=int, default=1000, help="Máximo de arquivos por lote gravado (padrão: %(default)s)")
+    _argumentos_comuns(watch, padroes)
+    stats = sub.add_parser("stats", help="Mínimo, máximo e média de cada coluna de um resultado (.npz, .parquet ou .csv)")
+    stats.add_argument("file", help="Arquivo gerado pelo extract")
+    stats.add_argument("--json", action='store_true', help="Imprime em JSON")
+    return parser
+
+def executar_extracao(args):
+    from extrator import GravadorSaida, compilar_tags, nivel_mensagem, processar_lote
+    try:
+        compilar_tags(tuple(args.tags))
+    except ValueError as e:
+        print(f"Tag inválida: {e}", file=sys.stderr)
+        return 2
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            print(f"Pasta não encontrada: {folder}", file=sys.stderr)
+            return 2
+    if args.per_folder:
+        os.makedirs(args.output, exist_ok=True)
+    elif not args.output.endswith(GravadorSaida.FORMATOS):
+        print("A saída deve terminar em .xlsx, .csv, .npz ou .parquet", file=sys.stderr)
+        return 2
+    if args.output.endswith(('.npz', '.parquet')):
+        try:
+            from tabela import verificar_dependencias
+            verificar_dependencias(args.output)
+        except (ImportError, ValueError) as e:
+            print(f"Formato de saída indisponível: {e}", file=sys.stderr)
+            return 2
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format='%(asctime)s - %(message)s', stream=sys.stderr)
+    resumo = processar_lote(args.folders, args.tags, args.ext, args.output,
+                            modo='multiple' if args.per_folder else 'single',
+                            workers=max(1, args.jobs), log=lambda message: logging.log(nivel_mensagem(message), message),
+                            cache=args.cache_file if args.cache else None, cache_max_entradas=args.cache_max,
+                            cache_verificar_conteudo=args.cache_verify_content,
+                            recursivo=args.recursive, incluir=args.include, excluir=args.exclude,
+                            tempo_limite=args.timeout, tamanho_maximo=args.max_size * 2**20 if args.max_size else None,
+                            medir=args.timings, perfil=args.profile,
+                            deduplicar={'unique': 'unico', 'all': 'todos'}.get(args.dedup),
+                            leitura_antecipada=max(0, args.read_ahead), threads_leitura=max(1, args.read_threads))
+    print(json.dumps({'files': resumo['files'], 'rows': resumo['rows'], 'errors': resumo['errors'],
+                      'cache_hits': resumo.get('cache_hits', 0), 'cache_misses': resumo.get('cache_misses', 0),
+                      'slow_files': resumo.get('slow_files', []), 'outputs': resumo['outputs'], 'elapsed_s': resumo['elapsed_s'],
+                      **({'timings': resumo['timings']} if 'timings' in resumo else {}), 'reports': resumo['reports'],
+                      **{chave: resumo[chave] for chave in ('duplicates', 'skipped_bytes', 'skipped_parses', 'hashed_bytes') if chave in resumo}}))
+    return 1 if resumo['save_errors'] else 0
+
+def executar_observacao(args):
+    from extrator import nivel_mensagem
+    from observador import ObservadorPastas
+    if not args.folders:
+        print("Nenhuma pasta para observar", file=sys.stderr)
+        return 2
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            print(f"Pasta não encontrada: {folder}", file=sys.stderr)
+            return 2
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format='%(asctime)s - %(message)s', stream=sys.stderr)
+    # Ctrl+C e o término do serviço encerram depois do lote em andamento
+    cancel_event = threading.Event()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sinal, lambda *_: cancel_event.set())
+    try:
+        observador = ObservadorPastas(args.folders, args.tags, args.ext, args.output, workers=max(1, args.jobs),
+                                      recursivo=args.recursive, incluir=args.include, excluir=args.exclude,
+                                      intervalo=args.interval, estabilidade=args.settle, lote_maximo=max(1, args.batch_max),
+                                      cache=args.cache_file if args.cache else None, cache_max_entradas=args.cache_max,
+                                      cache_verificar_conteudo=args.cache_verify_content,
+                                      log=lambda message: logging.log(nivel_mensagem(message), message), cancel_event=cancel_event)
+    except ValueError as e:
+        print(f"Não foi possível observar: {e}", file=sys.stderr)
+        return 2
+    resumo = observador.executar()
+    print(json.dumps(resumo))
+    return 1 if resumo['save_errors'] else 0
+
+def executar_estatisticas(args):
+    try:
+        from tabela import TabelaResultados, formatar_estatisticas
+        tabela = TabelaResultados.carregar(args.file)
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Não foi possível ler {args.file}: {e}", file=sys.stderr)
+        return 2
+    estatisticas = tabela.estatisticas()
+    if args.json:
+        # NaN não é JSON válido: colunas sem valores saem como null
+        valor = lambda x: None if x != x else x
+        print(json.dumps({'rows': len(tabela), 'columns': [{'column': c, 'count': q, 'min': valor(mn), 'max': valor(mx), 'mean': valor(md)}
+                                                           for c, q, mn, mx, md in estatisticas]}))
+    else:
+        print(f"{len(tabela)} arquivo(s)")
+        for linha in formatar_estatisticas(estatisticas): print(linha)
+    return 0
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.comando in ("extract", "watch"):
+        if args.include is None: args.include = args.include_config
+        if args.exclude is None: args.exclude = args.exclude_config
+    if args.comando == "extract":
+        return executar_extracao(args)
+    if args.comando == "watch":
+        return executar_observacao(args)
+    if args.comando == "stats":
+        return executar_estatisticas(args)
+    # A interface gráfica só é importada aqui, para a linha de comando não pagar o custo do Tk
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', filename='extrator.log', filemode='w')
+    import gui
+    gui.main()
+    return 0
 
 if __name__ == "__main__":
-    root = TkinterDnD.Tk()
-    app = App(root)
-    root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
\ No newline at end of file
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import os
+import re
+import csv
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import CacheExtracao
+from extrator import GravadorSaida, cabecalho_saida, compilar_tags, encontrar_arquivos, extrair_arquivos, extrair_com_cache
+
+def _sem_log(message):
+    pass
+
+# --- OBSERVAÇÃO DE PASTAS ---
+class ObservadorPastas:
+    # Acompanha as pastas por varredura periódica e extrai só os arquivos novos,
+    # acrescentando as linhas à saída:
+    # - um arquivo só é lido depois de ficar 'estabilidade' segundos com o mesmo
+    #   tamanho e data de modificação (ainda pode estar sendo copiado);
+    # - os arquivos prontos esperam até as pastas ficarem quietas por
+    #   'estabilidade' segundos, para uma rajada virar um único lote (limitado
+    #   a 'lote_maximo' arquivos e a 'espera_maxima' segundos de espera);
+    # - .csv: cada lote é acrescentado no fim do arquivo; .xlsx: cada lote vira
+    #   uma parte nova (saida_0001.xlsx, saida_0002.xlsx, ...). Nos dois casos o
+    #   custo de um lote não depende do tamanho do que já foi gravado.
+    # Ao iniciar, os caminhos que já estão na saída são considerados processados;
+    # os demais arquivos das pastas entram no primeiro lote.
+    # A varredura usa os.scandir: sem dependências, funciona também em
+    # compartilhamentos de rede, onde notificações do sistema não chegam.
+    def __init__(self, pastas, tags_template, extensoes, saida, workers=1, recursivo=False, incluir=(), excluir=(),
+                 intervalo=2.0, estabilidade=2.0, lote_maximo=1000, espera_maxima=30.0,
+                 cache=None, cache_max_entradas=None, log=_sem_log, cancel_event=None, cache_verificar_conteudo=False):
+        if not saida.endswith(('.csv', '.xlsx')):
+            raise ValueError("a saída deve terminar em .csv ou .xlsx")
+        compilar_tags(tuple(tags_template))
+        self.pastas = list(pastas)
+        self.tags_template = list(tags_template)
+        self.extensoes = extensoes
+        self.saida = saida
+        self.workers = workers
+        self.filtros = {'recursivo': recursivo, 'incluir': incluir, 'excluir': excluir}
+        self.intervalo = intervalo
+        self.estabilidade = estabilidade
+        self.lote_maximo = lote_maximo
+        self.espera_maxima = espera_maxima
+        self.cache, self.cache_max_entradas, self.cache_verificar_conteudo = cache, cache_max_entradas, cache_verificar_conteudo
+        self.log = log
+        self.cancel_event = cancel_event
+        self.header = cabecalho_saida(self.tags_template)
+        self.processados = self._ja_gravados()
+        self.candidatos = {} # caminho -> ((tamanho, mtime_ns), visto_desde)
+        self.prontos = []
+        self._na_fila = set()
+        self._ultima_mudanca = self._primeiro_pronto = 0.0
+        self.resumo = {'files': 0, 'rows': 0, 'errors': 0, 'batches': 0, 'outputs': [], 'save_errors': 0}
+
+    def _cancelado(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    # --- SAÍDA ---
+    def _partes_xlsx(self):
+        base = os.path.splitext(self.saida)[0]
+        padrao = re.compile(re.escape(os.path.basename(base)) + r"_(\d{4,})\.xlsx$")
+        partes = []
+        for caminho in glob.glob(glob.escape(base) + "_*.xlsx"):
+            m = padrao.match(os.path.basename(caminho))
+            if m: partes.append((int(m.group(1)), caminho))
+        return sorted(partes)
+
+    def _ja_gravados(self):
+        # Caminhos (primeira coluna) que já estão na saída de execuções anteriores
+        gravados = set()
+        if self.saida.endswith('.csv'):
+            if not os.path.exists(self.saida) or os.path.getsize(self.saida) == 0: return gravados
+            with open(self.saida, newline='', encoding='utf-8') as f:
+                leitor = csv.reader(f)
+                if next(leitor, None) != self.header:
+                    raise ValueError(f"{os.path.basename(self.saida)} tem outras colunas; escolha outra saída ou ajuste as tags")
+                for linha in leitor:
+                    if linha: gravados.add(linha[0])
+        else:
+            import openpyxl
+            for _, caminho in self._partes_xlsx():
+                workbook = openpyxl.load_workbook(caminho, read_only=True)
+                try:
+                    for (valor,) in workbook.active.iter_rows(min_row=2, max_col=1, values_only=True):
+                        if valor: gravados.add(valor)
+                finally:
+                    workbook.close()
+        return gravados
+
+    def _destino(self):
+        if self.saida.endswith('.csv'): return self.saida
+        partes = self._partes_xlsx()
+        numero = partes[-1][0] + 1 if partes else 1
+        return f"{os.path.splitext(self.saida)[0]}_{numero:04d}.xlsx"
+
+    # --- VARREDURA ---
+    def verificar(self, agora=None):
+        # Uma varredura: promove a 'prontos' os arquivos novos que já estão estáveis
+        agora = time.monotonic() if agora is None else agora
+        vistos = set()
+        for caminho in encontrar_arquivos(self.pastas, self.extensoes, **self.filtros):
+            if caminho in self.processados or caminho in self._na_fila: continue
+            vistos.add(caminho)
+            try:
+                st = os.stat(caminho)
+            except OSError:
+                continue
+            assinatura = (st.st_size, st.st_mtime_ns)
+            anterior = self.candidatos.get(caminho)
+            if anterior is None or anterior[0] != assinatura:
+                self.candidatos[caminho] = (assinatura, agora)
+                self._ultima_mudanca = agora
+            elif agora - anterior[1] >= self.estabilidade:
+                del self.candidatos[caminho]
+                if not self.prontos: self._primeiro_pronto = agora
+                self.prontos.append(caminho)
+                self._na_fila.add(caminho)
+        # Arquivos que sumiram antes de estabilizar (ex.: cópia temporária renomeada)
+        for caminho in [c for c in self.candidatos if c not in vistos]: del self.candidatos[caminho]
+
+    def lote_pronto(self, agora=None):
+        agora = time.monotonic() if agora is None else agora
+        if not self.prontos: return False
+        return (agora - self._ultima_mudanca >= self.estabilidade or len(self.prontos) >= self.lote_maximo
+                or agora - self._primeiro_pronto >= self.espera_maxima)
+
+    # --- EXTRAÇÃO ---
+    def processar(self, arquivos, motor):
+        # Extrai um lote e grava as linhas numa única abertura da saída.
+        # Retorna False se a gravação falhou.
+        destino = self._destino()
+        gravador, linhas, concluidos = None, 0, []
+        try:
+            for caminho, erro, dados in motor(arquivos):
+                if erro:
+                    self.log(f"AVISO: {os.path.basename(caminho)} - {erro}.")
+                    self.resumo['errors'] += 1
+                elif dados:
+                    if gravador is None: gravador = GravadorSaida(destino, self.header, anexar=True)
+                    gravador.escrever([caminho, os.path.basename(caminho)] + dados)
+                    linhas += 1
+                concluidos.append(caminho)
+            if gravador is not None: gravador.fechar()
+        except Exception as e:
+            self.log(f"ERRO ao salvar o arquivo {destino}: {e}")
+            self.resumo['save_errors'] += 1
+            return False
+        # Só conta como processado o que já está gravado na saída
+        self.processados.update(concluidos)
+        self._na_fila.difference_update(concluidos)
+        self.resumo['files'] += len(concluidos)
+        self.resumo['rows'] += linhas
+        self.resumo['batches'] += 1
+        if gravador is not None and destino not in self.resumo['outputs']: self.resumo['outputs'].append(destino)
+        self.log(f"Lote com {len(arquivos)} arquivo(s): {linhas} linha(s) acrescentada(s) em {os.path.basename(destino)}")
+        return True
+
+    def executar(self):
+        # Observa até o cancelamento; retorna o resumo do que foi extraído
+        self.log(f"Observando {len(self.pastas)} pasta(s) a cada {self.intervalo:g} s. "
+                 f"{len(self.processados)} arquivo(s) já estão em {os.path.basename(self.saida)}.")
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        cache_extracao = None
+        if self.cache:
+            opcoes = {'max_entradas': self.cache_max_entradas} if self.cache_max_entradas else {}
+            try:
+                cache_extracao = CacheExtracao(self.cache, self.tags_template, verificar_conteudo=self.cache_verificar_conteudo, **opcoes)
+            except Exception as e:
+                self.log(f"AVISO: cache de resultados indisponível ({e}).")
+        extrair = lambda arquivos: extrair_arquivos(arquivos, self.tags_template, self.workers, cancel_event=self.cancel_event, executor=executor)
+        if cache_extracao is not None:
+            motor = lambda arquivos: extrair_com_cache(arquivos, self.tags_template, cache_extracao, cancel_event=self.cancel_event, motor=extrair, log=self.log)
+        else:
+            motor = extrair
+        try:
+            while not self._cancelado():
+                self.verificar()
+                if self.lote_pronto():
+                    lote, self.prontos = self.prontos[:self.lote_maximo], self.prontos[self.lote_maximo:]
+                    if self.prontos: self._primeiro_pronto = time.monotonic()
+                    gravado = self.processar(lote, motor)
+                    # Um lote interrompido ou com falha volta para a fila
+                    pendentes = [c for c in lote if c not in self.processados]
+                    self.prontos[:0] = pendentes
+                    if pendentes: self._primeiro_pronto = time.monotonic()
+                    # Com arquivos acumulados além de lote_maximo, segue sem esperar
+                    if gravado and self.prontos: continue
+                if self.cancel_event is not None: self.cancel_event.wait(self.intervalo)
+                else: time.sleep(self.intervalo)
+        finally:
+            if executor: executor.shutdown(wait=False, cancel_futures=True)
+            if cache_extracao is not None: cache_extracao.fechar()
+        self.log(f"Observação encerrada: {self.resumo['files']} arquivo(s), {self.resumo['rows']} linha(s) em {self.resumo['batches']} lote(s).")
+        return self.resumo
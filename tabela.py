@@ -0,0 +1,162 @@
+import os
+import csv
+
+import numpy as np
+
+# --- TABELA DE RESULTADOS EM COLUNAS ---
+class TabelaResultados:
+    # Resultados guardados em colunas: os valores numéricos num array float64
+    # (NaN onde não há valor), os caminhos numa coluna de texto à parte, e as
+    # colunas capturadas com campos=linha em listas de texto. As linhas entram
+    # em blocos pré-alocados, sem um objeto float por valor.
+    # Depende do numpy; o .parquet depende também do pyarrow.
+    LINHAS_POR_BLOCO = 4096
+
+    def __init__(self, colunas, colunas_texto=()):
+        self.colunas = list(colunas)
+        texto = set(colunas_texto)
+        self._numericas = [i for i in range(len(self.colunas)) if i not in texto]
+        self._texto = sorted(texto)
+        self.caminhos = []
+        self.textos = [[] for _ in self._texto]
+        self._blocos = [] # Blocos já cheios (ou consolidados em 'valores')
+        self._atual = None
+        self._usadas = 0
+        self._valores = None
+
+    def __len__(self):
+        return len(self.caminhos)
+
+    @property
+    def colunas_numericas(self):
+        return [self.colunas[i] for i in self._numericas]
+
+    @property
+    def colunas_texto(self):
+        return [self.colunas[i] for i in self._texto]
+
+    def adicionar(self, caminho, valores):
+        # valores: uma posição por coluna, como nas linhas de GravadorSaida
+        if self._atual is None or self._usadas == self.LINHAS_POR_BLOCO:
+            if self._atual is not None: self._blocos.append(self._atual)
+            self._atual = np.full((self.LINHAS_POR_BLOCO, len(self._numericas)), np.nan)
+            self._usadas = 0
+        linha = self._atual[self._usadas]
+        for j, i in enumerate(self._numericas):
+            if valores[i] is not None: linha[j] = valores[i]
+        for lista, i in zip(self.textos, self._texto): lista.append(valores[i] or '')
+        self.caminhos.append(caminho)
+        self._usadas += 1
+        self._valores = None
+
+    @property
+    def valores(self):
+        # Array (linhas x colunas numéricas); montado uma vez e reaproveitado
+        if self._valores is None:
+            blocos = self._blocos + ([self._atual[:self._usadas]] if self._atual is not None else [])
+            self._valores = np.concatenate(blocos) if blocos else np.empty((0, len(self._numericas)))
+            self._blocos, self._atual = [self._valores], None
+        return self._valores
+
+    def estatisticas(self):
+        # [(coluna, quantidade, mínimo, máximo, média)] por coluna numérica;
+        # colunas sem nenhum valor ficam com NaN
+        valores = self.valores
+        quantidade = np.count_nonzero(~np.isnan(valores), axis=0)
+        minimo = np.fmin.reduce(valores, axis=0, initial=np.nan) # fmin/fmax ignoram NaN sem avisos
+        maximo = np.fmax.reduce(valores, axis=0, initial=np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.nansum(valores, axis=0) / quantidade
+        return [(coluna, int(q), float(mn), float(mx), float(md))
+                for coluna, q, mn, mx, md in zip(self.colunas_numericas, quantidade, minimo, maximo, media)]
+
+    # --- ARQUIVOS ---
+    def salvar(self, path):
+        if path.endswith('.npz'): return self.salvar_npz(path)
+        if path.endswith('.parquet'): return self.salvar_parquet(path)
+        raise ValueError(f"formato de tabela não suportado: {os.path.basename(path)}")
+
+    def salvar_npz(self, path):
+        dados = {'colunas': np.array(self.colunas_numericas, dtype=str), 'caminhos': np.array(self.caminhos, dtype=str),
+                 'valores': self.valores}
+        if self._texto:
+            dados['colunas_texto'] = np.array(self.colunas_texto, dtype=str)
+            dados['textos'] = np.array(self.textos, dtype=str).reshape(len(self._texto), len(self))
+        np.savez_compressed(path, **dados)
+
+    def salvar_parquet(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("salvar em .parquet requer o pacote pyarrow (pip install pyarrow)") from None
+        colunas = {"Caminho do Arquivo": pa.array(self.caminhos, pa.string())}
+        valores = self.valores
+        for i, coluna in enumerate(self.colunas):
+            if i in self._texto:
+                colunas[coluna] = pa.array(self.textos[self._texto.index(i)], pa.string())
+            else:
+                colunas[coluna] = pa.array(valores[:, self._numericas.index(i)], from_pandas=True) # NaN vira nulo
+        pq.write_table(pa.table(colunas), path)
+
+    @classmethod
+    def carregar(cls, path):
+        # Lê .npz, .parquet ou a planilha .csv gerada pelo extrator
+        if path.endswith('.npz'):
+            with np.load(path, allow_pickle=False) as dados:
+                colunas = dados['colunas'].tolist()
+                colunas_texto = dados['colunas_texto'].tolist() if 'colunas_texto' in dados else []
+                tabela = cls(colunas + colunas_texto, range(len(colunas), len(colunas) + len(colunas_texto)))
+                tabela.caminhos = dados['caminhos'].tolist()
+                tabela._valores = dados['valores']
+                tabela._blocos = [tabela._valores]
+                if colunas_texto: tabela.textos = dados['textos'].tolist()
+            return tabela
+        if path.endswith('.parquet'):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ValueError("ler .parquet requer o pacote pyarrow (pip install pyarrow)") from None
+            tabela_pq = pq.read_table(path)
+            nomes = tabela_pq.column_names[1:]
+            texto = [i for i, nome in enumerate(nomes) if pa.types.is_string(tabela_pq.schema.field(nome).type)]
+            tabela = cls(nomes, texto)
+            for linha in tabela_pq.to_pylist():
+                tabela.adicionar(linha["Caminho do Arquivo"], [linha[nome] for nome in nomes])
+            return tabela
+        if path.endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as f:
+                leitor = csv.reader(f)
+                nomes = next(leitor, ["", ""])[2:]
+                linhas = list(leitor)
+            # Uma coluna é de texto se algum valor não for número
+            texto = set()
+            for linha in linhas:
+                for i, valor in enumerate(linha[2:]):
+                    if i in texto or not valor: continue
+                    try:
+                        float(valor)
+                    except ValueError:
+                        texto.add(i)
+            tabela = cls(nomes, texto)
+            for linha in linhas:
+                tabela.adicionar(linha[0], [(v if i in texto else float(v)) if v else None for i, v in enumerate(linha[2:])])
+            return tabela
+        raise ValueError(f"formato de tabela não suportado: {os.path.basename(path)}")
+
+def formatar_estatisticas(estatisticas):
+    # Linhas de texto alinhadas para o log ou o terminal
+    largura = max([len(coluna) for coluna, *_ in estatisticas] + [6])
+    yield f"{'Coluna':<{largura}}  {'Qtd':>6}  {'Mínimo':>12}  {'Máximo':>12}  {'Média':>12}"
+    for coluna, quantidade, minimo, maximo, media in estatisticas:
+        if not quantidade: continue
+        yield f"{coluna:<{largura}}  {quantidade:>6}  {minimo:>12.4g}  {maximo:>12.4g}  {media:>12.4g}"
+
+def verificar_dependencias(path):
+    # Para avisar antes do lote, e não só ao gravar, que falta o pyarrow
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet # noqa: F401
+        except ImportError:
+            raise ValueError("salvar em .parquet requer o pacote pyarrow (pip install pyarrow)") from None